@@ -4,128 +4,159 @@ import re
 import sys
 import argparse
 import logging
-from itertools import islice
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 from datetime import datetime
 import config
+import run_metrics
+from run_metrics import phase
+from records import BranchTarget, IssueInfo, RevokeOutcome, branch_targets
+from user_index import reset_user_ids, resolve_gitlab_user_id
+from api_clients import enable_response_cache, get_gitlab_client, get_jira_client, request_counts, reset_request_counts
+from async_engine import run_concurrently
+from protected_branches import get_protected_branch, reset_protected_branch_indexes, update_protected_branch
+from revoke_plan import (access_rules, build_patch_payload, build_plan_document, describe_branch_plan, load_plan,
+                         merge_revocations, plan_branch_revocation, rule_matches_user, rule_matches_users, write_plan)
+
 
-# Generate a timestamped filename for the log file
-log_filename = datetime.now().strftime('access_revoke_%Y%m%d_%H%M%S.log')
-logging.basicConfig(
-    filename=log_filename,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-logging.getLogger().addHandler(console_handler)
-
-gitlab_api_url = config.gitlab_api_url
-jira_api_url = config.jira_api_url
 project_search_all = config.project_search_all
-username = config.username
-password = config.password
+# Set by --journal/--resume; records each revoked branch and finished Jira so reruns skip them.
+run_journal = None
+# Set by --results; streams one JSONL/CSV record per Jira as soon as its outcome is final.
+result_sink = None
+# Set by --mr_index; merged MRs recorded by mr_webhook.py / mr_crawler.py, read before falling back to MR search.
+merge_request_index = None
 
 
-def get_username(jira_id):
-    # Retrieves the assignee's display name from a Jira ticket.
-    url = f"{jira_api_url}/issue/{jira_id}"
+# Jira fields needed by the revoke flow; every lookup below reads from the same IssueInfo snapshot.
+issue_fields = "assignee,status,fixVersions,updated"
+issue_snapshots = {}
+
+
+# Fetches a Jira issue once (only the fields we use) and caches it as an IssueInfo for the run.
+def get_issue_snapshot(jira_id):
+    if jira_id in issue_snapshots:
+        return "Success", issue_snapshots[jira_id]
+
     try:
-        response = requests.get(url, auth=(username, password))
+        response = get_jira_client().get(f"/issue/{jira_id}", params={"fields": issue_fields})
         if response.status_code == 200:
             logging.info(f"Successfully retrieved Jira details for {jira_id}.")
-            userresponse_json = response.json()
-            
-            if userresponse_json['key'] != jira_id:
-                error_message = f"Mismatched Jira ID. Requested: {jira_id}, Received: {userresponse_json['key']}. Status Code: {response.status_code}"
-                logging.error(error_message)
-                return "error", error_message
-                
-            assignee = userresponse_json["fields"]["assignee"]["displayName"]
-            logging.info(f"Assignee found for {jira_id}: {assignee}")
-            return "Success", assignee
+            issue_snapshots[jira_id] = IssueInfo.from_json(response.json())
+            return "Success", issue_snapshots[jira_id]
         else:
             error_message = f"Failed to retrieve Jira details for {jira_id}. Status Code: {response.status_code}. Response: {response.text}"
             logging.error(error_message)
             return "error", error_message
-            
+
     except requests.exceptions.RequestException as e:
         error_message = f"Request error while fetching Jira details for {jira_id}: {e}"
         logging.error(error_message)
         return "error", error_message
+
+
+def get_username(jira_id):
+    # Retrieves the assignee's display name from a Jira ticket.
+    issue_status, issue_info = get_issue_snapshot(jira_id)
+    if issue_status == "error":
+        return "error", issue_info
+
+    if issue_info.key != jira_id:
+        error_message = f"Mismatched Jira ID. Requested: {jira_id}, Received: {issue_info.key}."
+        logging.error(error_message)
+        return "error", error_message
+
+    assignee = issue_info.assignee
+    if not assignee:
+        error_message = f"No assignee found for {jira_id}."
+        logging.error(error_message)
+        return "error", error_message
+    logging.info(f"Assignee found for {jira_id}: {assignee}")
+    return "Success", assignee
+
+
+def get_assignee_email(jira_id):
+    issue_info = issue_snapshots.get(jira_id)
+    return issue_info.email if issue_info else None
     
 # get jira state from the jira
+# Returns ("Success", state) for Closed/Resolved issues, ("skipped", message) for any other state.
 def get_jira_state(jira_id):
-    url = f"{jira_api_url}/issue/{jira_id}"
-    try:
-        response = requests.get(url, auth=(username, password))
-        if response.status_code == 200:
-            status_response = response.json()  
-            name=status_response.get('fields',{}).get('status',{}).get('name')
-            if name == 'Closed' or name == 'Resolved':
-                logging.info(f"Jira issue is {name}. Proceeding with branch access revoking")
-                return name
-            else:
-                logging.warning(f"Jira issue is {name}. Can't revoke access until the issue is RESOLVED / CLOSED")
-                sys.exit()
-        else:
-            error_message = f"Failed to retrieve Jira status for {jira_id}. Status Code: {response.status_code}. Response: {response.text}"
-            logging.error(error_message)
-            return error_message
-            
-    except requests.exceptions.RequestException as e:
-        error_message = f"Request error while fetching Jira details for {jira_id}: {e}"
-        logging.error(error_message)
-        return "error", error_message
+    issue_status, issue_info = get_issue_snapshot(jira_id)
+    if issue_status == "error":
+        return "error", issue_info
+
+    name = issue_info.status
+    if name == 'Closed' or name == 'Resolved':
+        logging.info(f"Jira issue is {name}. Proceeding with branch access revoking")
+        return "Success", name
+    else:
+        warning_message = f"Jira issue is {name}. Can't revoke access until the issue is RESOLVED / CLOSED"
+        logging.warning(warning_message)
+        return "skipped", warning_message
 
     
 # get branch_name from jira for unlinked mr.
 def get_branch_from_jira(jira_id):
-    url = f"{jira_api_url}/issue/{jira_id}"
+    issue_status, issue_info = get_issue_snapshot(jira_id)
+    if issue_status == "error":
+        return "error", issue_info
+
     try:
-        response = requests.get(url, auth=(username, password))
-        if response.status_code == 200:
-            response_json = response.json()
-
-            # get 'name' field from fixVersions
-            fixversion_data=response_json.get('fields',{}).get('fixVersions',[])
-            if not fixversion_data:
-                logging.error(f"FixVersion field is empty or invalid {fixversion_data}. Can't proceed with branch access revoke")
-                sys.exit()
-            if fixversion_data:
-                branches = [
-                    item.get('name').replace('R', '.')
-                    for item in fixversion_data 
-                    if item.get('name')  
-                ]
-            return "Success",branches
-            
-        else:
-            error_message = f"Failed to retrieve Jira details for {jira_id}. Status Code: {response.status_code}. Response: {response.text}"
+        # 'name' fields of fixVersions
+        fixversion_data = issue_info.fix_versions
+        if not fixversion_data:
+            error_message = f"FixVersion field is empty or invalid {list(fixversion_data)}. Can't proceed with branch access revoke"
             logging.error(error_message)
             return "error", error_message
-        
-    except requests.exceptions.RequestException as e:
-        error_message = f"Request error while fetching Jira details for {jira_id}: {e}"
-        logging.error(error_message)
-        return "error", error_message
+        branches = list(dict.fromkeys(name.replace('R', '.') for name in fixversion_data))
+        return "Success",branches
+
     except Exception as e:
         error_message = f"Unexpected error in get_branch_from_jira for {jira_id}: {e}"
         logging.error(error_message)
         return "error", error_message
 
+# Streams the merged MRs found for a Jira, one page (per_page=100) at a time, following X-Next-Page.
+# Jiras with a release MR in the local MR index are answered from it without any GitLab call;
+# anything else (including index files written before non-release MRs were dropped) is searched.
+def iter_jira_merge_requests(jira_id, private_token):
+    if merge_request_index:
+        indexed = [
+            merge_request for merge_request in merge_request_index.lookup(jira_id)
+            if (merge_request.get("target_branch") or "").startswith("release/")
+        ]
+        if indexed:
+            logging.info(f"Found {len(indexed)} merged MRs for {jira_id} in the local MR index.")
+            yield from indexed
+            return
+        logging.info(f"{jira_id} has no release MR in the local MR index. Falling back to MR search.")
+    for page in get_gitlab_client(private_token).iter_pages(f"{project_search_all}{jira_id}"):
+        yield from page
+
+
 # Retrieves Gitlab projects and release branches associated with a Jira ID via MR search.
 def get_branch_project_map(jira_id, private_token, qa_mode=False):
-    api_url = f"{gitlab_api_url}{project_search_all}{jira_id}"
     projectId_branch_map = {} 
     projectId_repo_map = {}
+    seen_targets = set()
+    skipped_projects = set()
     try:
-        mr_response = requests.get(api_url, headers={"PRIVATE-TOKEN": private_token}) 
-        if mr_response.status_code != 200 or not mr_response.json():
-            error_message = f"MR is Not Linked to {jira_id}. Status Code: {mr_response.status_code}. Response: {mr_response.text}"
+        merge_requests = iter_jira_merge_requests(jira_id, private_token)
+        try:
+            first_mr = next(merge_requests, None)
+            mr_detail = "No merged MRs found."
+        except requests.exceptions.HTTPError as e:
+            first_mr = None
+            mr_detail = f"Status Code: {e.response.status_code}. Response: {e.response.text}"
+
+        if first_mr is None:
+            error_message = f"MR is Not Linked to {jira_id}. {mr_detail}"
             logging.error(error_message)
 
-            logging.info(f"Response: {mr_response.status_code} Without MR executing....")
+            logging.info("Without MR executing....")
             # Logic for DEV tickets with no MRs
             if (not projectId_repo_map) and (jira_id.split('-')[0] == 'DEV') and (not qa_mode):
                 logging.info("Entering into default repo execution...")
@@ -134,24 +165,21 @@ def get_branch_project_map(jira_id, private_token, qa_mode=False):
                 limited_repos = dict(islice(projectId_repo_map.items(), 5))
                 branch_status, branches_from_jira=get_branch_from_jira(jira_id)
 
-                if branch_status == "Success":
-                    for project_id in limited_repos.keys():
-                        projectId_branch_map[project_id] = branches_from_jira
+                if branch_status != "Success":
+                    return "error", branches_from_jira
+                for project_id in limited_repos.keys():
+                    projectId_branch_map[project_id] = branches_from_jira
                 return "Success", projectId_branch_map 
             else:
                 logging.error(f"Cannot proceed with default repos for {jira_id}: Failed to retrieve branch name from QA Jira.")
                 return "error", error_message
             
         else:
-                logging.info(f"Response: {mr_response.status_code} With MR executing....")
-                response_data = mr_response.json()
-                if not response_data:
-                    logging.error("No merged mr found in jira to process ...exiting")
-                    sys.exit(1)
-                
-                # logging.info(f"Successfully retrieved {len(response_data)} merge requests for {jira_id}.")
+                logging.info("With MR executing....")
                 repo_name=""
-                for item in response_data:
+                # MRs are consumed as pages arrive. Only the first five projects are kept, but the search
+                # is read to the end so later MRs of those projects still add their branches.
+                for item in chain([first_mr], merge_requests):
                     project_id = item.get('target_project_id')
                     repo_url = item.get('web_url')
                     match = re.search(r'\/([^\/]+)\/-\/', repo_url)
@@ -170,9 +198,16 @@ def get_branch_project_map(jira_id, private_token, qa_mode=False):
                             continue
 
                         if project_id not in projectId_branch_map:
+                            if len(projectId_branch_map) == 5:
+                                if not skipped_projects:
+                                    logging.warning(f"There are more than five repos associated with {jira_id}. Limiting to the first 5 repos.")
+                                skipped_projects.add(project_id)
+                                continue
                             projectId_branch_map[project_id] = []
                         
-                        if branch_name not in projectId_branch_map[project_id]:
+                        target = BranchTarget(project_id, branch_name)
+                        if target not in seen_targets:
+                            seen_targets.add(target)
                             projectId_branch_map[project_id].append(branch_name)
                 print("Repository Name : ",repo_name)
 
@@ -181,12 +216,7 @@ def get_branch_project_map(jira_id, private_token, qa_mode=False):
                     logging.warning(error_message)
                     return "error", error_message
                     
-                if len(projectId_branch_map) > 5:
-                    warning_message = f"There are more than five repos associated with {jira_id} ({len(projectId_branch_map)}). Limiting to the first 5 repos."
-                    logging.warning(warning_message)
-                    
-                limited_map = dict(islice(projectId_branch_map.items(), 5)) # processsing only first 5 projects
-                return "Success", limited_map
+                return "Success", projectId_branch_map
     
     except requests.exceptions.RequestException as e:
         error_message = f"Request error while fetching GitLab MRs for {jira_id}: {e}"
@@ -197,113 +227,574 @@ def get_branch_project_map(jira_id, private_token, qa_mode=False):
         logging.error(error_message)
         return "error", error_message
     
+# Pages through a Jira search and primes the issue snapshots, so the per-Jira lookups need no extra calls.
+def search_jira_issues(jql):
+    jira_client = get_jira_client()
+    jiraslist = []
+    start_at = 0
+    try:
+        while True:
+            params = {"jql": jql, "fields": issue_fields, "startAt": start_at, "maxResults": config.jira_page_size}
+            response = jira_client.get("/search", params=params)
+            if response.status_code != 200:
+                error_message = f"Failed to search Jira issues for '{jql}'. Status Code: {response.status_code}. Response: {response.text}"
+                logging.error(error_message)
+                return "error", error_message
+
+            page = response.json()
+            issues = page.get('issues', [])
+            for issue in issues:
+                issue_snapshots[issue['key']] = IssueInfo.from_json(issue)
+                jiraslist.append(issue['key'])
+
+            start_at += len(issues)
+            if not issues or start_at >= page.get('total', 0):
+                break
+        return "Success", jiraslist
+
+    except requests.exceptions.RequestException as e:
+        error_message = f"Request error while searching Jira issues for '{jql}': {e}"
+        logging.error(error_message)
+        return "error", error_message
+
+
 # filter_id based
 def get_jirafilterlist(filterid):
-    filterstring = f"{jira_api_url}/search?jql=filter={filterid}&fields=key"
     logging.info(f"Fetching Jira list from filter ID: {filterid}")
+    search_status, search_result = search_jira_issues(f"filter={filterid}")
+    if search_status == "error":
+        logging.error(f"Failed to retrieve Jira list from filter {filterid}.")
+        return "error"
+    logging.info(f"Successfully retrieved {len(search_result)} Jiras from filter {filterid}. Status Code: 200")
+    return search_result
+
+
+# Bulk mode for -j lists: resolves every Jira with one 'key in (...)' search instead of per-issue GETs.
+def prefetch_jira_issues(jira_list):
+    pending = [jira_id for jira_id in jira_list if jira_id not in issue_snapshots]
+    for i in range(0, len(pending), config.jira_page_size):
+        chunk = pending[i:i + config.jira_page_size]
+        search_status, _ = search_jira_issues(f"key in ({','.join(chunk)})")
+        if search_status == "error":
+            # Jira rejects the whole query if one key is unknown; those Jiras fall back to per-issue lookups.
+            logging.warning(f"Bulk Jira lookup failed for {chunk}. Falling back to per-issue lookups.")
+    logging.info(f"Prefetched {len(issue_snapshots)} Jira issues in bulk.")
+
+
+# Plans the revocation for one protected release branch: every push/merge/unprotect rule of the user.
+# Returns (status, project_id, branch, branch_plan); when the branch can't be read the status is
+# "error" and the last item the error message, so a failed read is never taken for "no rules".
+def plan_branch_access(username, project_id, branch, private_token, prefetch=False, user_id=None):
+    logging.info(f"Checking protected branch: release%2F{branch}")
     try:
-        response = requests.get(filterstring, auth=(username, password))
-        if response.status_code == 200:
-            filterresponse_json = response.json()
-            jiraslist = [item['key'] for item in filterresponse_json.get('issues', [])]
-            logging.info(f"Successfully retrieved {len(jiraslist)} Jiras from filter {filterid}. Status Code: 200")
-            return jiraslist
+        response_data = get_protected_branch(project_id, branch, private_token, prefetch)
+        if response_data is None:
+            logging.warning(f"Branch 'release/{branch}' is not protected in project ID {project_id} (404 Not Found). Skipping revocation.")
+            return "Success", project_id, branch, {}
+
+        branch_plan = plan_branch_revocation(access_rules(response_data), rule_matches_user(username, {user_id} if user_id else None))
+        for patch_field, rule_ids in branch_plan.items():
+            logging.info(f"Found {patch_field} rule IDs to revoke for {username} in project {project_id} on branch {branch}: {rule_ids}")
+        if not branch_plan: # if no user in Gitlab for protected branch
+            logging.info(f"User '{username}' does not have specific PUSH or MERGE access levels on branch '{branch}' in project {project_id} to revoke.")
+        return "Success", project_id, branch, branch_plan
+
+    except requests.exceptions.HTTPError as e:
+        error_message = f"HTTP error during protected branch check for 'release/{branch}' in project {project_id}: {e}. Status code: {e.response.status_code}"
+    except requests.exceptions.RequestException as e:
+        error_message = f"Request error while revoking access for branch 'release/{branch}' in project {project_id}: {e}"
+    except Exception as e:
+        error_message = f"Unexpected error while revoking access for branch 'release/{branch}' in project {project_id}: {e}"
+    logging.error(error_message)
+    return "error", project_id, branch, error_message
+
+
+# Executes one branch plan with a single PATCH that destroys all of its rules.
+# A batched PATCH passes every covered user in `usernames` so each gets its own journal entry.
+def apply_branch_plan(username, project_id, branch, branch_plan, private_token, usernames=None):
+    branch_path = f"/projects/{project_id}/protected_branches/release%2F{branch}"
+    users = usernames or [username]
+    try:
+        destroy_response = get_gitlab_client(private_token).patch(branch_path, json=build_patch_payload(branch_plan))
+
+        if destroy_response.status_code == 200:
+            update_protected_branch(project_id, private_token, destroy_response.json())
+            message=f"Successfully revoked {describe_branch_plan(branch_plan)} access for '{username}' on branch '{branch}' in project {project_id}"
+            logging.info(message)
+            if run_journal:
+                for user in users:
+                    run_journal.record("branch", user=user, project_id=project_id, branch=branch, message=message)
+            return RevokeOutcome("Success", message, project_id, branch, users)
         else:
-            logging.error(f"Failed to retrieve Jira list from filter {filterid}. Status Code: {response.status_code}. Response: {response.text}")
-            return "error"
+            error_message = f"Failed to remove access levels for repository '{project_id}'. Status Code: '{destroy_response.status_code}', Response: '{destroy_response.text}'."
+            logging.error(error_message)
+            return RevokeOutcome("error", error_message, project_id, branch, users)
+
     except requests.exceptions.RequestException as e:
-        logging.error(f"Request error while fetching Jira filter {filterid}: {e}")
-        return "error"
-    
+        error_message = f"Request error while revoking access for branch 'release/{branch}' in project {project_id}: {e}"
+        logging.error(error_message)
+        return RevokeOutcome("error", error_message, project_id, branch, users)
+
+
+# Branches of a user's map still to revoke: [BranchTarget], minus those the journal has as done.
+def pending_branch_targets(username, branch_project_id_map):
+    logging.info(f"Processing Project IDs: {list(branch_project_id_map)}")
+    targets = []
+    for target in branch_targets(branch_project_id_map):
+        if run_journal and run_journal.completed("branch", user=username, project_id=target.project_id, branch=target.branch):
+            logging.info(f"Access for '{username}' on branch '{target.branch}' in project {target.project_id} already revoked (journal). Skipping.")
+            continue
+        targets.append(target)
+    return targets
+
+
+# Planning phase (reads only): ("Success", [(project_id, branch, branch_plan)]) for every branch with
+# rules to destroy, or ("error", [error messages]) when any branch could not be read.
+def plan_user_access(username, branch_project_id_map, private_token, concurrency=None, prefetch=False, user_id=None):
+    work_items = [
+        (username, target.project_id, target.branch, private_token, prefetch, user_id)
+        for target in pending_branch_targets(username, branch_project_id_map)
+    ]
+    planned = run_concurrently(work_items, plan_branch_access, concurrency)
+    errors = [branch_plan for status, _, _, branch_plan in planned if status == "error"]
+    if errors:
+        return "error", errors
+    return "Success", [(project_id, branch, branch_plan) for _, project_id, branch, branch_plan in planned if branch_plan]
+
+
+_branch_locks = {}
+_branch_locks_guard = threading.Lock()
+
+
+def _branch_lock(target):
+    with _branch_locks_guard:
+        if target not in _branch_locks:
+            _branch_locks[target] = threading.Lock()
+        return _branch_locks[target]
+
+
+# Plans and PATCHes one branch while holding its lock. Two Jiras of the same assignee on one
+# branch (e.g. with --workers) no longer PATCH the same rule IDs: the second plans after the
+# first's PATCH and finds nothing left. None when there was nothing to revoke; a failed read is an
+# "error" outcome like a failed PATCH.
+def revoke_branch_access(username, project_id, branch, private_token, prefetch=False, user_id=None):
+    with _branch_lock(BranchTarget(project_id, branch)):
+        status, _, _, branch_plan = plan_branch_access(username, project_id, branch, private_token, prefetch, user_id)
+        if status == "error":
+            return RevokeOutcome("error", branch_plan, project_id, branch, [username])
+        if not branch_plan:
+            return None
+        return apply_branch_plan(username, project_id, branch, branch_plan, private_token)
+
 
 # Revoke Script
-def revoke_access(username, branch_project_id_map, private_token):
-    results=[]
+def revoke_access(username, branch_project_id_map, private_token, concurrency=None, prefetch=False, user_id=None):
     # Revokes push/merge access for a user on protected GitLab branches.
     logging.info(f"--- Starting access revocation for user '{username}' ---")
-    for project_id, branches in branch_project_id_map.items():
-        logging.info(f"Processing Project ID: {project_id}")
-
-        for branch in branches:
-            full_branch_name = f"release%2F{branch}"
-            logging.info(f"Checking protected branch: {full_branch_name}")
-            base_url = f"{gitlab_api_url}/projects/{project_id}/protected_branches/{full_branch_name}"
-            headers = {
-                "PRIVATE-TOKEN": private_token,
-                "Content-Type": "application/json"
-            }
-
-            push_access_rule_id = None
-            merge_access_rule_id = None
-            
-            try:
-                response = requests.get(base_url, headers=headers) 
-                if response.status_code == 404:
-                    logging.warning(f"Branch 'release/{branch}' is not protected in project ID {project_id} (404 Not Found). Skipping revocation.")
-                    continue
-                    
-                response.raise_for_status() 
-                response_data = response.json()
-
-
-                push_access_levels = response_data.get('push_access_levels', [])
-                for access_rule in push_access_levels:
-                    if access_rule.get('access_level_description') == username:
-                        push_access_rule_id = access_rule.get('id')
-                        logging.info(f"Found PUSH access ID to revoke for {username} in project {project_id} on branch {branch}: {push_access_rule_id}")
-                        break
-
-                merge_access_levels = response_data.get('merge_access_levels', [])
-                for access_rule in merge_access_levels:
-                    if access_rule.get('access_level_description') == username:
-                        merge_access_rule_id = access_rule.get('id')
-                        logging.info(f"Found MERGE access ID to revoke for {username} in project {project_id} on branch {branch}: {merge_access_rule_id}")
-                        break
-                        
-                # destroy the user using patch
-                payload = {}
-                revoked_message = []
-
-                if push_access_rule_id:
-                    payload["allowed_to_push"] = [{"id": push_access_rule_id, "_destroy": True}]
-                    revoked_message.append("PUSH")
-
-                if merge_access_rule_id:
-                    payload["allowed_to_merge"] = [{"id": merge_access_rule_id, "_destroy": True}]
-                    revoked_message.append("MERGE")
-              
-                if not payload: # if no user in Gitlab for protected branch
-                    logging.info(f"User '{username}' does not have specific PUSH or MERGE access levels on branch '{branch}' in project {project_id} to revoke.")
-                    continue
-                
-                # PATCH Request
-                destroy_response = requests.patch(base_url, headers=headers, json=payload)
-
-                if destroy_response.status_code == 200:
-                    message=f"Successfully revoked {', '.join(revoked_message)} access for '{username}' on branch '{branch}' in project {project_id}"
-                    logging.info(message)
-                    results.append(("Success",message))
-                else:
-                    error_message = f"Failed to remove access levels for repository '{project_id}'. Status Code: '{response.status_code}', Response: '{response.text}'."
-                    logging.error(error_message)
-                    results.append(("error", error_message))
-               
-                if not payload and (not push_access_rule_id and not merge_access_rule_id): 
-                    logging.info(f"User '{username}' does not have specific PUSH or MERGE access levels on protected branch 'release/{branch}' in project {project_id} to revoke.")
-                    continue
-
-            except requests.exceptions.HTTPError as e:
-                logging.error(f"HTTP error during protected branch check for 'release/{branch}' in project {project_id}: {e}. Status code: {e.response.status_code}")
-            except requests.exceptions.RequestException as e:
-                logging.error(f"Request error while revoking access for branch 'release/{branch}' in project {project_id}: {e}")
-            except Exception as e:
-                logging.error(f"Unexpected error while revoking access for branch 'release/{branch}' in project {project_id}: {e}")
+    work_items = [
+        (username, target.project_id, target.branch, private_token, prefetch, user_id)
+        for target in pending_branch_targets(username, branch_project_id_map)
+    ]
+    results = [outcome for outcome in run_concurrently(work_items, revoke_branch_access, concurrency) if outcome]
     logging.info(f"--------------- Finished access revocation for user '{username}' ----------------") 
     return results
 
+
+# Runs a saved plan: PATCHes only, no Jira or GitLab reads.
+def apply_saved_plan(plan_document, private_token, concurrency=None):
+    # Plans written before revocations were merged may list a branch more than once.
+    patch_items = [
+        (revocation["user"], revocation["project_id"], revocation["branch"], revocation["rules"], private_token, revocation.get("users"))
+        for revocation in merge_revocations(plan_document.get("revocations", []))
+        if not (run_journal and all(
+            run_journal.completed("branch", user=user, project_id=revocation["project_id"], branch=revocation["branch"])
+            for user in revocation.get("users") or [revocation["user"]]
+        ))
+    ]
+    logging.info(f"Applying saved plan with {len(patch_items)} branch revocations.")
+    return run_concurrently(patch_items, apply_branch_plan, concurrency)
+
+
+# Branches a batched Jira result covers: {BranchTarget}; empty for unresolved Jiras.
+def batched_branches(result):
+    if result.get("Revoke Status") != "Batched":
+        return set()
+    return set(branch_targets(result["Branch_Project Status"]))
+
+
+# Inverts the per-Jira branch maps into {BranchTarget: {username: user_id}} so every
+# protected branch shared by several assignees is read and PATCHed once.
+def group_branch_users(results_summary):
+    branch_users = {}
+    for result in results_summary:
+        if result.get("Revoke Status") != "Batched":
+            continue
+        username = result["User Status"]
+        for target in branch_targets(result["Branch_Project Status"]):
+            if run_journal and run_journal.completed("branch", user=username, project_id=target.project_id, branch=target.branch):
+                logging.info(f"Access for '{username}' on branch '{target.branch}' in project {target.project_id} already revoked (journal). Skipping.")
+                continue
+            branch_users.setdefault(target, {})[username] = result.get("User ID")
+    return branch_users
+
+
+# Plans one protected branch for a whole batch of users: one GET, the union of their rules.
+# Returns (status, project_id, branch, branch_plan, usernames that had rules on the branch); when the
+# branch can't be read the status is "error" and branch_plan the error message.
+def plan_branch_users(project_id, branch, users, private_token, prefetch=False):
+    logging.info(f"Checking protected branch: release%2F{branch} for {len(users)} users")
+    try:
+        response_data = get_protected_branch(project_id, branch, private_token, prefetch)
+        if response_data is None:
+            logging.warning(f"Branch 'release/{branch}' is not protected in project ID {project_id} (404 Not Found). Skipping revocation.")
+            return "Success", project_id, branch, {}, []
+
+        rules = access_rules(response_data)
+        branch_plan = plan_branch_revocation(rules, rule_matches_users(users))
+        usernames = [
+            username for username, user_id in sorted(users.items())
+            if any(map(rule_matches_user(username, {user_id} if user_id else None), rules))
+        ]
+        for patch_field, rule_ids in branch_plan.items():
+            logging.info(f"Found {patch_field} rule IDs to revoke for {usernames} in project {project_id} on branch {branch}: {rule_ids}")
+        if not branch_plan:
+            logging.info(f"None of {sorted(users)} have specific PUSH or MERGE access levels on branch '{branch}' in project {project_id} to revoke.")
+        return "Success", project_id, branch, branch_plan, usernames
+
+    except requests.exceptions.HTTPError as e:
+        error_message = f"HTTP error during protected branch check for 'release/{branch}' in project {project_id}: {e}. Status code: {e.response.status_code}"
+    except requests.exceptions.RequestException as e:
+        error_message = f"Request error while revoking access for branch 'release/{branch}' in project {project_id}: {e}"
+    except Exception as e:
+        error_message = f"Unexpected error while revoking access for branch 'release/{branch}' in project {project_id}: {e}"
+    logging.error(error_message)
+    return "error", project_id, branch, error_message, []
+
+
+# Batched revoke stage (--batch): after every Jira is resolved, each protected branch is fetched
+# once and a single PATCH destroys the rules of all its users. Returns ([(project_id, branch,
+# branch_plan, usernames)], {BranchTarget: status}); dry runs only carry the branches that failed to read.
+def revoke_batched(results_summary, private_token, concurrency=None, prefetch=False, plan_only=False):
+    branch_users = group_branch_users(results_summary)
+    logging.info(f"Batched {sum(len(users) for users in branch_users.values())} user/branch revocations into {len(branch_users)} protected branches.")
+    work_items = [(target.project_id, target.branch, users, private_token, prefetch) for target, users in branch_users.items()]
+    with phase("plan"):
+        planned = run_concurrently(work_items, plan_branch_users, concurrency)
+    # Branches that couldn't be read fail every user grouped on them.
+    branch_statuses = {BranchTarget(project_id, branch): status for status, project_id, branch, _, _ in planned if status == "error"}
+    batch_plan = [(project_id, branch, branch_plan, usernames) for status, project_id, branch, branch_plan, usernames in planned if status == "Success" and branch_plan]
+    if plan_only:
+        return batch_plan, branch_statuses
+
+    patch_items = [
+        (', '.join(usernames), project_id, branch, branch_plan, private_token, usernames)
+        for project_id, branch, branch_plan, usernames in batch_plan
+    ]
+    with phase("revoke"):
+        results = run_concurrently(patch_items, apply_branch_plan, concurrency)
+    branch_statuses.update({BranchTarget(outcome.project_id, outcome.branch): outcome.status for outcome in results})
+    return batch_plan, branch_statuses
+
+
+# One saved-plan revocation per batched branch, listing every Jira and user it covers.
+def batched_revocations(results_summary, batch_plan):
+    revocations = []
+    for project_id, branch, branch_plan, usernames in batch_plan:
+        jiras = [
+            result["Jira"] for result in results_summary
+            if result["User Status"] in usernames and BranchTarget(project_id, branch) in batched_branches(result)
+        ]
+        revocations.append({
+            "jira": ', '.join(jiras), "user": ', '.join(usernames), "users": usernames,
+            "project_id": project_id, "branch": branch, "rules": branch_plan,
+        })
+    return revocations
+
+
+# Folds the per-branch statuses of a batched revoke back into each Jira's results_summary entry.
+def finish_batched_results(results_summary, batch_plan, branch_statuses, plan_only=False):
+    covered = {BranchTarget(project_id, branch): usernames for project_id, branch, _, usernames in batch_plan}
+    for result in results_summary:
+        branches = batched_branches(result)
+        if not branches:
+            continue
+        # A branch outside the plan only has a status when reading it failed.
+        statuses = [
+            branch_statuses.get(target) for target in branches
+            if result["User Status"] in covered.get(target, []) or branch_statuses.get(target) == "error"
+        ]
+        if "error" in statuses:
+            result["Outcome"] = result["Revoke Status"] = "error"
+        elif plan_only:
+            result["Revoke Status"] = "Planned"
+        else:
+            result["Revoke Status"] = "Success" if statuses else "Skipped/No Access Found"
+        result.pop("User ID", None)
+
+
+# Runs the full pipeline for a single Jira and returns its results_summary entry.
+# Never exits: every Jira ends with an "Outcome" of "Success", "skipped" (not Closed/Resolved) or "error".
+# With batch the Jira stops once resolved ("Revoke Status": "Batched"); revoke_batched does the rest.
+def process_jira(each_jira, private_token, qa_mode=False, position="", concurrency=None, prefetch=False, plan_only=False, batch=False):
+    logging.info(f"--- Processing Jira {position}: {each_jira} ---")
+
+    # USER RETRIEVAL
+    with phase("user lookup"):
+        user_status, user_result = get_username(each_jira)
+    if user_status == "error":
+        return {"Jira": each_jira, "Outcome": "error", "User Status": user_result}
+
+    # Jira state - Resolved for DEV Jira
+    with phase("state check"):
+        state_status, status_result = get_jira_state(each_jira)
+    if state_status != "Success":
+        return {"Jira": each_jira, "Outcome": state_status, "User Status": user_result, "Jira status" : status_result}
+
+    # BRANCH-PROJECT MAP 
+    with phase("branch map"):
+        branch_project_status, branch_project_result = get_branch_project_map(each_jira, private_token, qa_mode)
+    logging.info(f"Branch/Project map result for {each_jira}: {branch_project_result}")
+    
+    if branch_project_status == "error":
+        return {
+            "Jira": each_jira, "Outcome": "error", "User Status": user_result, "Jira status" : status_result,
+            "Branch_Project Status": branch_project_result,
+        }
+
+    # GITLAB USER - rules are matched by user_id once the assignee is resolved
+    with phase("user resolution"):
+        user_id = resolve_gitlab_user_id(user_result, get_assignee_email(each_jira), private_token)
+
+    if batch:
+        return {
+            "Jira": each_jira, "Outcome": "Success", "User Status": user_result, "User ID": user_id,
+            "Branch_Project Status": branch_project_result, "Revoke Status": "Batched",
+        }
+
+    # PLAN ONLY - no write calls
+    if plan_only:
+        with phase("plan"):
+            plan_status, revocation_plan = plan_user_access(user_result, branch_project_result, private_token, concurrency, prefetch, user_id)
+        if plan_status == "error":
+            logging.error(revocation_plan)
+            return {
+                "Jira": each_jira, "Outcome": "error", "User Status": user_result, "Jira status" : status_result,
+                "Branch_Project Status": branch_project_result, "Revoke Status": "error",
+            }
+        return {
+            "Jira": each_jira, "Outcome": "Success", "User Status": user_result, "Branch_Project Status": branch_project_result,
+            "Revoke Status": "Planned", "Revoke Plan": revocation_plan,
+        }
+
+    # REVOKE BRANCH ACCESS
+    with phase("revoke"):
+        result = revoke_access(user_result, branch_project_result, private_token, concurrency, prefetch, user_id)
+    revoke_status = "Skipped/No Access Found"
+    if result:
+        revoke_status = "error" if any(status == "error" for status, _ in result) else "Success"
+    print("Revoke status :", revoke_status)
+
+    if revoke_status == "error":
+        logging.error(result)
+        return {
+            "Jira": each_jira,
+            "Outcome": "error",
+            "User Status": user_result,
+            "Jira status" : status_result,
+            "Branch_Project Status": branch_project_result,
+            "Revoke Status": revoke_status
+        }
+
+    return {
+        "Jira": each_jira, "Outcome": "Success", "User Status": user_result, "Branch_Project Status": branch_project_result,
+        "Revoke Status": revoke_status
+    }
+
+
+# Journaled result of a Jira, or None to run it. Entries carry the issue's `updated` value, so a
+# Jira reopened and closed again since (and re-queued by --watch) is run again, not skipped.
+def journaled_jira(jira_id):
+    completed = run_journal.completed("jira", jira=jira_id) if run_journal else None
+    snapshot = issue_snapshots.get(jira_id)
+    if completed and snapshot and snapshot.updated and completed.get("updated") != snapshot.updated:
+        logging.info(f"{jira_id} was updated since it was journaled ({completed.get('updated')} -> {snapshot.updated}). Running it again.")
+        return None
+    return completed
+
+
+def journal_jira(result):
+    snapshot = issue_snapshots.get(result["Jira"])
+    run_journal.record("jira", jira=result["Jira"], updated=snapshot.updated if snapshot else None, result=result)
+
+
+# Runs the pipeline over a list of Jiras (workers, journal, retries, --batch) and returns
+# (results_summary, plan revocations); the revocations are empty unless args.plan is set.
+def process_jira_list(jira_list, private_token, args):
+    def run_jira(indexed_jira):
+        i, each_jira = indexed_jira
+        completed = journaled_jira(each_jira)
+        if completed:
+            logging.info(f"--- Jira {i+1}/{len(jira_list)}: {each_jira} already completed (journal). Skipping. ---")
+            return completed["result"]
+        result = process_jira(each_jira, private_token, args.qa_mode, f"{i+1}/{len(jira_list)}", args.concurrency, args.prefetch, bool(args.plan), args.batch)
+        # Only successful Jiras are journaled so a resumed run retries the rest; batched ones once revoked.
+        if run_journal and result["Outcome"] == "Success" and result["Revoke Status"] != "Batched":
+            journal_jira(result)
+        # Failed Jiras are written after the retries, batched ones once their branches are revoked.
+        if result_sink and result["Outcome"] != "error" and result.get("Revoke Status") != "Batched":
+            result_sink.write(result)
+        return result
+
+    # executor.map yields in input order, so results_summary stays deterministic whatever the worker count.
+    if args.workers > 1:
+        logging.info(f"Processing {len(jira_list)} Jiras with {args.workers} workers.")
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results_summary = list(executor.map(run_jira, enumerate(jira_list)))
+    else:
+        results_summary = [run_jira(indexed_jira) for indexed_jira in enumerate(jira_list)]
+
+    # Failed Jiras are retried in place; anything already fetched comes from the issue snapshots.
+    for retry in range(args.retry_failed):
+        failed = [i for i, result in enumerate(results_summary) if result["Outcome"] == "error"]
+        if not failed:
+            break
+        logging.info(f"Retrying {len(failed)} failed Jiras (attempt {retry+1}/{args.retry_failed}).")
+        for i in failed:
+            results_summary[i] = run_jira((i, jira_list[i]))
+    if result_sink:
+        for result in results_summary:
+            if result["Outcome"] == "error":
+                result_sink.write(result)
+
+    revocations = []
+    if args.batch:
+        batched = [result for result in results_summary if batched_branches(result)]
+        batch_plan, branch_statuses = revoke_batched(results_summary, private_token, args.concurrency, args.prefetch, bool(args.plan))
+        revocations = batched_revocations(results_summary, batch_plan)
+        finish_batched_results(results_summary, batch_plan, branch_statuses, bool(args.plan))
+        for result in batched:
+            if run_journal and result["Outcome"] == "Success":
+                journal_jira(result)
+            if result_sink:
+                result_sink.write(result)
+    elif args.plan:
+        # Jiras sharing an assignee and branch become one revocation, as in --batch.
+        revocations = merge_revocations([
+            {"jira": result["Jira"], "user": result["User Status"], "project_id": project_id, "branch": branch, "rules": branch_plan}
+            for result in results_summary
+            for project_id, branch, branch_plan in result.get("Revoke Plan", [])
+        ])
+
+    skipped = [result["Jira"] for result in results_summary if result["Outcome"] == "skipped"]
+    failed = [result["Jira"] for result in results_summary if result["Outcome"] == "error"]
+    if skipped:
+        logging.warning(f"Skipped Jiras (not RESOLVED / CLOSED): {skipped}")
+    if failed:
+        logging.error(f"Failed Jiras: {failed}")
+    return results_summary, revocations
+
+
+# --watch: polls the filter for newly Closed/Resolved Jiras and runs only those through the pipeline.
+# The mark is saved after every cycle, so a restarted watcher carries on where it stopped.
+def watch_filter(filterid, state_path, private_token, args):
+    from jira_watch import WatchState
+    watch_state = WatchState(state_path)
+    cycle = 0
+    while True:
+        cycle += 1
+        jql = watch_state.build_jql(filterid)
+        logging.info(f"--- Watch cycle {cycle}: {jql} ---")
+        # Snapshots and branch indexes from the previous cycle may be stale; this cycle re-primes them.
+        issue_snapshots.clear()
+        reset_protected_branch_indexes()
+        search_status, search_result = search_jira_issues(jql)
+        if search_status == "error":
+            logging.error(f"Watch cycle {cycle} could not search Jira. Retrying next cycle.")
+        else:
+            issues = [issue_snapshots[jira_id] for jira_id in search_result]
+            # Capped per cycle; the mark only passes processed issues, so the rest come back next cycle.
+            jira_list = watch_state.pending(issues)[:config.max_Jiras]
+            if jira_list:
+                logging.info(f"Watch cycle {cycle}: {len(jira_list)} Jiras to process: {jira_list}")
+                results_summary, _ = process_jira_list(jira_list, private_token, args)
+                log_results_summary(results_summary)
+                watch_state.advance(issues, results_summary)
+                watch_state.save()
+            else:
+                logging.info(f"Watch cycle {cycle}: no newly Closed/Resolved Jiras.")
+
+        if args.max_cycles and cycle >= args.max_cycles:
+            return
+        time.sleep(args.poll_interval)
+
+
+def close_result_sink():
+    global result_sink
+    if result_sink:
+        summary = result_sink.close()
+        logging.info(f"Results written to {result_sink.path}: {summary['total']} Jiras, outcomes {summary['outcomes']}. Summary in {result_sink.path}.summary.json")
+        result_sink = None
+
+
+# Per-run state is module-level, so main() starts from a clean slate and can be called again
+# in the same process (revoke.py in a scheduler loop, tests).
+def reset_run_state():
+    global run_journal, merge_request_index, result_sink
+    run_journal = merge_request_index = result_sink = None
+    issue_snapshots.clear()
+    reset_user_ids()
+    reset_protected_branch_indexes()
+    reset_request_counts()
+    run_metrics.reset()
+
+
+# Closes whatever the run opened, also when it ended early or with an exception.
+def close_run_state():
+    global run_journal, merge_request_index
+    close_result_sink()
+    if run_journal:
+        run_journal.close()
+        run_journal = None
+    if merge_request_index:
+        merge_request_index.close()
+        merge_request_index = None
+
+
+# Per-Jira log lines; with --results the same records are already streamed to the sink.
+def log_results_summary(results_summary):
+    if result_sink:
+        return
+    for result in results_summary:
+        logging.info(f"Results Summary: Jira : %s, User: %s, Project-branch map result: %s,  Revoke Status: %s", 
+                     result['Jira'], result['User Status'], result.get('Branch_Project Status'), result.get('Revoke Status'))
+
+
+_log_handlers = []
+
+
+# Timestamped log file plus console output. Called from main(), so importing this module
+# (revoke.py, tests, schedulers) never opens a log file. Each call replaces the handlers of the
+# previous one, so every run gets its own log file and one console handler.
+def configure_logging():
+    root_logger = logging.getLogger()
+    for handler in _log_handlers:
+        root_logger.removeHandler(handler)
+        handler.close()
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler(datetime.now().strftime('access_revoke_%Y%m%d_%H%M%S.log'))
+    console_handler = logging.StreamHandler()
+    _log_handlers[:] = [file_handler, console_handler]
+    for handler in _log_handlers:
+        handler.setLevel(logging.INFO)
+        handler.setFormatter(formatter)
+        root_logger.addHandler(handler)
+    root_logger.setLevel(logging.INFO)
+
+
 # MAIN SCRIPT
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="GitLab Protected Branch Access Revocation Tool.")
+# Returns the exit code: 0, or 1 when the arguments are unusable or any Jira/revocation failed.
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="GitLab Protected Branch Access Revocation Tool.")
     parser.add_argument('-g', '--gitlab_token', help='GitLab private token', required=True)
     parser.add_argument('-j', '--jira_list', type=str, help='Comma-separated list of Jira IDs (e.g., JIRA-1,JIRA-2)')
     parser.add_argument('-f', '--filterid', type=str, help='Jira filter ID to fetch a list of Jiras')
@@ -311,17 +802,81 @@ if __name__ == "__main__":
     parser.add_argument('-b', '--branch', nargs="+", help='')
     # Optional param
     parser.add_argument("-QA", "--qa_mode", action="store_true", help="This is for QA repo tickets only")
-    args = parser.parse_args()
+    parser.add_argument('--workers', type=int, default=1, help='Number of Jiras to process concurrently')
+    parser.add_argument('--concurrency', type=int, default=config.gitlab_concurrency, help='Number of protected branches revoked concurrently')
+    parser.add_argument('--prefetch', action='store_true', help='List protected release branches once per project instead of one GET per branch')
+    parser.add_argument('--cache_dir', type=str, help='Cache Jira and MR-search responses on disk in this directory')
+    parser.add_argument('--plan', type=str, help='Dry run: resolve everything with reads only and write the revoke plan (JSON) to this file')
+    parser.add_argument('--apply_plan', type=str, help='Apply a plan file written by --plan (PATCH calls only)')
+    parser.add_argument('--journal', type=str, help='Write a resumable JSONL journal of completed steps to this file')
+    parser.add_argument('--resume', type=str, help='Resume from a journal written by --journal, skipping completed work')
+    parser.add_argument('--retry_failed', type=int, default=1, help='Number of times failed Jiras are retried at the end of the run')
+    parser.add_argument('--metrics_json', type=str, help='Write the per-endpoint/per-phase timing report (JSON) to this file')
+    parser.add_argument('--bulk', action='store_true', help='Resolve all Jiras of a -j list with one paginated Jira search')
+    parser.add_argument('--batch', action='store_true', help='Group all Jiras by branch: one protected-branch GET and one PATCH per branch for all users')
+    parser.add_argument('--results', type=str, help='Stream one record per Jira to this JSONL file (CSV if it ends in .csv); the run summary goes to <file>.summary.json')
+    parser.add_argument('--mr_index', nargs='?', const=config.mr_index_path, help='Read Jira MRs from the local MR index (mr_webhook.py, mr_crawler.py) before searching GitLab')
+    parser.add_argument('--watch', type=str, help='Keep polling the -f filter and revoke as Jiras close; the high-water mark is kept in this file')
+    parser.add_argument('--poll_interval', type=float, default=config.watch_poll_seconds, help='Seconds between --watch polls')
+    parser.add_argument('--max_cycles', type=int, default=0, help='Stop --watch after this many polls (0 = run until interrupted)')
+    args = parser.parse_args(argv)
+    configure_logging()
+    reset_run_state()
+    try:
+        return run(parser, args)
+    finally:
+        close_run_state()
+
+
+def run(parser, args):
+    global run_journal, merge_request_index, result_sink
     private_token = args.gitlab_token
+    enable_response_cache(args.cache_dir)
+
+    # Optional stores are imported only when their flag is used.
+    if args.mr_index:
+        from mr_index import MergeRequestIndex
+        merge_request_index = MergeRequestIndex(args.mr_index)
+
+    # Dry runs change nothing, so they are never journaled.
+    journal_path = args.resume or args.journal
+    if journal_path and not args.plan:
+        from run_journal import RunJournal
+        run_journal = RunJournal(journal_path)
+        logging.info(f"Journaling completed steps to {journal_path}.")
+
+    if args.apply_plan:
+        outcomes = apply_saved_plan(load_plan(args.apply_plan), private_token, args.concurrency)
+        for status, message in outcomes:
+            logging.info(f"Plan result: {status}: {message}")
+        return 1 if any(outcome.status == "error" for outcome in outcomes) else 0
     
     if not args.jira_list and not args.filterid:
         logging.warning("Must provide either a list of Jiras (-j/--jira_list) or a filter ID (-f/--filterid).")
         parser.print_help()
-        exit(1)
+        return 1
 
     if args.jira_list and args.filterid:
         logging.warning("Must Provide either a Jira List or a Filter ID, but not both arguments to the script.")
-        exit(1)
+        return 1
+
+    if args.results:
+        from result_sink import ResultSink
+        result_sink = ResultSink(args.results)
+
+    if args.watch:
+        if not args.filterid or args.plan:
+            logging.warning("--watch needs a filter ID (-f/--filterid) and cannot be combined with --plan.")
+            return 1
+        try:
+            watch_filter(args.filterid, args.watch, private_token, args)
+        except KeyboardInterrupt:
+            logging.info(f"Watch stopped. High-water mark is kept in {args.watch}.")
+        close_result_sink()
+        run_metrics.log_summary()
+        if args.metrics_json:
+            run_metrics.export_json(args.metrics_json)
+        return 0
 
     jira_list = None
     if args.filterid:  # FILTER ID BASED
@@ -329,75 +884,40 @@ if __name__ == "__main__":
         jira_list_result = get_jirafilterlist(args.filterid)
         if jira_list_result == "error":
             logging.error(f"Exiting due to error fetching Jiras from filter ID {args.filterid}.")
-            exit(1)
+            return 1
         jira_list = jira_list_result
     elif args.jira_list: # JIRA BASED
         jira_list = [x.strip() for x in args.jira_list.split(",")]
         logging.info(f"List of Jiras provided: {jira_list}")
     if not jira_list: # NONE
         logging.warning("No Jiras were found or provided to process.")
-        exit(0)
+        return 0
 
     logging.info(f"Jira list : {jira_list}")
     if len(jira_list) > config.max_Jiras: 
         logging.error(f"The number of Jiras ({len(jira_list)}) exceeds the maximum allowed limit of {config.max_Jiras}. Exiting.")
-        exit()
-    
-    
-    results_summary = []
-    for i, each_jira in enumerate(jira_list):
-        logging.info(f"--- Processing Jira {i+1}/{len(jira_list)}: {each_jira} ---")
-
-        # USER RETRIEVAL
-        user_status, user_result = get_username(each_jira)
-        if user_status == "error":
-            results_summary.append({
-            "Jira": each_jira, "User Status": user_result,
-            })
-            continue
+        return 1
 
-        # Jira state - Resolved for DEV Jira
-        status_result = get_jira_state(each_jira)
-        if status_result == "error":
-            results_summary.append({
-                "Jira": each_jira, "User Status": user_result, "Jira status" : status_result,
-            })
-            continue
-            
+    if args.bulk and args.jira_list:
+        prefetch_jira_issues(jira_list)
+    if merge_request_index:
+        # One local query for the whole run instead of one MR search per Jira.
+        merge_request_index.preload(jira_list)
 
-        # BRANCH-PROJECT MAP 
-        branch_project_status, branch_project_result = get_branch_project_map(each_jira, private_token, args.qa_mode)
-        logging.info(f"Branch/Project map result for {each_jira}: {branch_project_result}")
-        
-        if branch_project_status == "error":
-            results_summary.append({
-                "Jira": each_jira, "User Status": user_result, "Jira status" : status_result, "Branch_Project Status": branch_project_result, 
-            })
-            continue
+    results_summary, revocations = process_jira_list(jira_list, private_token, args)
 
-        # REVOKE BRANCH ACCESS
-        result = revoke_access(user_result, branch_project_result, private_token)
-        revoke_status = "Skipped/No Access Found"
-        if result:
-            revoke_status = result[0][0]
-        print("Revoke status :", revoke_status)
+    if args.plan:
+        plan_document = build_plan_document(revocations, sum(request_counts().values()), args.concurrency)
+        write_plan(args.plan, plan_document)
+        logging.info(f"Revoke plan written to {args.plan}. Estimate: {plan_document['estimate']}")
 
-        if revoke_status == "error":
-            logging.error(result)
-            results_summary.append({
-            "Jira": each_jira,
-            "User Status": user_result,
-            "Jira status" : status_result,
-            "Branch_Project Status": branch_project_result,
-            "Revoke Status": revoke_status
-            })
-            continue
+    log_results_summary(results_summary)
+    close_result_sink()
+    run_metrics.log_summary()
+    if args.metrics_json:
+        run_metrics.export_json(args.metrics_json)
+    return 1 if any(result["Outcome"] == "error" for result in results_summary) else 0
 
 
-        results_summary.append({
-                "Jira": each_jira, "User Status": user_result, "Branch_Project Status": branch_project_result, "Revoke Status": revoke_status
-        })
-        for result in results_summary:
-            logging.info(f"Results Summary: Jira : %s, User: %s, Project-branch map result: %s,  Revoke Status: %s", 
-                         result['Jira'], result['User Status'], result['Branch_Project Status'],result['Revoke Status'])
-    
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,15 @@ import logging
 from itertools import islice
 from datetime import datetime
 import config
+import run_metrics
+from run_metrics import phase
+from api_clients import get_gitlab_client, request_counts, reset_request_counts
+from protected_branches import get_protected_branch, reset_protected_branch_indexes, update_protected_branch
+from revoke_plan import (access_rules, build_patch_payload, build_plan_document, is_user_rule, load_plan,
+                         plan_branch_revocation, write_plan)
+from async_engine import run_concurrently
+from branch_discovery import discover_branches
+from records import BranchTarget, RevokeOutcome
 
 # log_file_name = datetime.now().strftime('access_revoke_%Y%m%d_%H%M%S.log')
 # logging.basicConfig(
@@ -22,138 +31,141 @@ import config
 gitlab_api_url = config.gitlab_api_url
 
 
-# def fetch_active_branches():
-#     scba_api_url = "https://scdb.vaultdev.com/default/latest/manifest/active_versions"
-#     scba_api_data = None
-    
-#     try:
-#         response = requests.get(scba_api_url)
-#         response.raise_for_status() 
-#         scba_api_data = response.json()
-#     except Exception as e:
-#         print(f"Error fetching live data ({e}). Could not retrieve data from API.")
-#         scba_api_data = {"pipeline": []}
-            
-#     pipeline_versions = [item["name"] for item in scba_api_data["pipeline"]]
-#     target_branches = []
-
-#     def is_internal_release(version):
-#         internal_releases = ['1.1', '2.1', '3.1']
-#         parts = version.split('.')
-#         if len(parts) < 3:
-#             return False
-#         sprint_patch = f"{parts[1]}.{parts[2]}"
-#         return sprint_patch in internal_releases
-    
-#     def get_base_sprint(version):
-#         parts = version.split('.')
-#         return f"{parts[0]}.{parts[1]}"
+# Plans the revocation of every user-level rule on one protected release branch (reads only).
+# Returns (status, project_id, branch, branch_plan, usernames); a branch that can't be read is
+# "error" with the message in place of the plan, so the sweep counts it as failed.
+def plan_branch_all_users(project_id, branch, private_token, prefetch=False):
+    print(f"release%2F{branch}")
+    try:
+        response_data = get_protected_branch(project_id, branch, private_token, prefetch)
+        if response_data is None:
+            logging.warning(f"Branch 'release/{branch}' is not protected in project ID {project_id} (404 Not Found). Skipping revocation.")
+            return "Success", project_id, branch, {}, []
 
-#     if is_internal_release(pipeline_versions[0]):
-#         target_branches = pipeline_versions[:3] 
-        
-#     elif is_internal_release(pipeline_versions[1]):
-#         target_branches.append(pipeline_versions[0])
-#         target_branches.append(pipeline_versions[2])
-#         target_branches.append(pipeline_versions[3])
-        
-#     else:
-#         target_branches.append(pipeline_versions[0])
-#         target_branches.append(pipeline_versions[1])
-    
-#         base_sprint = get_base_sprint(pipeline_versions[0]) 
-#         print(base_sprint)
-#         target_x0_version = f"{base_sprint}.0"
-        
-#         found_x0 = None
-#         for version in pipeline_versions:
-#             if version == target_x0_version:
-#                 found_x0 = version
-#                 break
+        rules = access_rules(response_data)
+        branch_plan = plan_branch_revocation(rules, is_user_rule)
+        revoked_usernames = sorted({
+            access_rule.description for access_rule in rules
+            if is_user_rule(access_rule) and access_rule.description
+        })
+        for patch_field, rule_ids in branch_plan.items():
+            print(f"Found {patch_field} access IDs {rule_ids} to revoke.")
+
+        if not branch_plan:
+            print(f"No specific user access rules found to revoke on branch '{branch}'.")
+        return "Success", project_id, branch, branch_plan, revoked_usernames
+
+    except requests.exceptions.HTTPError as e:
+        error_message = f"HTTP error during protected branch check for 'release/{branch}' in project {project_id}: {e}."
+    except requests.exceptions.RequestException as e:
+        error_message = f"Request error while revoking access for branch 'release/{branch}' in project {project_id}: {e}"
+    except Exception as e:
+        error_message = f"Error occured while revoking the branch access: {e}"
+    print(error_message)
+    logging.error(error_message)
+    return "error", project_id, branch, error_message, []
+
+
+# Destroys all planned rules on one branch with a single PATCH.
+def apply_branch_all_users(project_id, branch, branch_plan, revoked_usernames, private_token):
+    payload = build_patch_payload(branch_plan)
+    print(payload)
+    print("\n\nAttempting to revoke access for users...")
+    try:
+        destroy_response = get_gitlab_client(private_token).patch(f"/projects/{project_id}/protected_branches/release%2F{branch}", json=payload)
         
-#         if found_x0:
-#             target_branches.append(found_x0)
-#     return target_branches
-
-
-def revoke_all_access(branches, repo_list, private_token):
-    for project_id,project_name in repo_list.items():
-        print(f"Project_id: {project_id}, Project_name: {project_name} being revoked....")
-        for branch in branches:
-            full_branch_name = f"release%2F{branch}"
-            print(full_branch_name)
-            base_url = f"{gitlab_api_url}/projects/{project_id}/protected_branches/{full_branch_name}"
-            headers = {
-                "PRIVATE-TOKEN": private_token,
-                "Content-Type": "application/json"
-            }
-
-            user_push_ids = []
-            user_merge_ids = []
-            revoked_usernames = []
-
-            try:
-                response = requests.get(base_url, headers=headers)
-                if response.status_code == 404:
-                    logging.warning(f"Branch 'release/{branch}' is not protected in project ID {project_id} (404 Not Found). Skipping revocation.")
-                    continue
-                response.raise_for_status() 
-                response_data = response.json()
-
-                push_access_levels = response_data.get('push_access_levels', [])
-                for access_rule in push_access_levels:
-                    if access_rule.get('user_id') is not None and access_rule.get('group_id') is None:
-                        user_push_ids.append(access_rule['id'])
-                        username = access_rule.get('access_level_description')
-                        if username and username not in revoked_usernames:
-                            revoked_usernames.append(username)
-                        print(f"Found PUSH access ID {access_rule['id']} for user '{username}' to revoke.")
-
-                merge_access_levels = response_data.get('merge_access_levels', [])
-                for access_rule in merge_access_levels:
-                    if access_rule.get('user_id') is not None and access_rule.get('group_id') is None:
-                        user_merge_ids.append(access_rule['id'])
-                        username = access_rule.get('access_level_description')
-                        if username and username not in revoked_usernames:
-                            revoked_usernames.append(username)
-                        print(f"Found MERGE access ID {access_rule['id']} for user '{username}' to revoke.")
-
-                payload = {}
-                if user_push_ids:
-                    payload["allowed_to_push"] = [{"id": rule_id, "_destroy": True} for rule_id in user_push_ids]
-                if user_merge_ids:
-                    payload["allowed_to_merge"] = [{"id": rule_id, "_destroy": True} for rule_id in user_merge_ids]
-
-                print(payload)
-
-                total_revoked_count = len(user_push_ids) + len(user_merge_ids)
-                if total_revoked_count == 0:
-                    print(f"No specific user access rules found to revoke on branch '{branch}'.")
-                    exit()
-                
-                print("\n\nAttempting to revoke access for users...")
-                destroy_response = requests.patch(base_url, headers=headers, json=payload)
-                
-                if destroy_response.status_code == 200:
-                    usernames_list = ', '.join(revoked_usernames)
-                    message = f"Successfully revoked {usernames_list} user access rules on branch '{branch}'."
-                    print(message)
-                else:
-                    error_message = f"Failed to remove access on '{branch}'. Status: {destroy_response.status_code}"
-                    logging.error(error_message)
-                    print(f"Failed to remove access on '{branch}'. Status: {destroy_response.status_code}")
-                
-            except requests.exceptions.HTTPError as e:
-                print(f"HTTP error during protected branch check for 'release/{branch}' in project {project_id}: {e}.")
-            except requests.exceptions.RequestException as e:
-                print(f"Request error while revoking access for branch 'release/{branch}' in project {project_id}: {e}")
-            except Exception as e:
-                print(f"Error occured while revoking the branch access.")
+        if destroy_response.status_code == 200:
+            update_protected_branch(project_id, private_token, destroy_response.json())
+            usernames_list = ', '.join(revoked_usernames)
+            message = f"Successfully revoked {usernames_list} user access rules on branch '{branch}'."
+            print(message)
+            return RevokeOutcome("Success", message, project_id, branch, revoked_usernames)
+        else:
+            error_message = f"Failed to remove access on '{branch}'. Status: {destroy_response.status_code}"
+            logging.error(error_message)
+            print(error_message)
+            return RevokeOutcome("error", error_message, project_id, branch, revoked_usernames)
+
+    except requests.exceptions.RequestException as e:
+        error_message = f"Request error while revoking access for branch 'release/{branch}' in project {project_id}: {e}"
+        print(error_message)
+        return RevokeOutcome("error", error_message, project_id, branch, revoked_usernames)
+
+
+# Flattens the selected groups into (group, BranchTarget) work items. A project listed in several
+# groups is swept once, under the first of them.
+def build_sweep_items(groups, selected_groups, branches):
+    sweep_items = []
+    seen_targets = set()
+    for group_name in selected_groups:
+        if group_name not in groups:
+            print(f"Group '{group_name}' is not configured in config.all_repos. Skipping.")
+            continue
+        for repo_list in groups[group_name]:
+            for project_id, project_name in repo_list.items():
+                print(f"{group_name}: Project_id: {project_id}, Project_name: {project_name} queued....")
+                for branch in branches:
+                    target = BranchTarget(project_id, branch)
+                    if target not in seen_targets:
+                        seen_targets.add(target)
+                        sweep_items.append((group_name, target))
+    return sweep_items
+
+
+# Org-wide sweep: every selected group's project x branch items share one bounded executor,
+# first for the planning reads, then for the PATCHes. Returns (revocations, per-group report).
+def sweep_groups(groups, selected_groups, branches, private_token, concurrency=None, prefetch=False, plan_only=False):
+    sweep_items = build_sweep_items(groups, selected_groups, branches)
+    report = {
+        group_name: {"projects": set(), "branches_checked": 0, "branches_planned": 0, "revoked": 0, "failed": 0, "users": set()}
+        for group_name in selected_groups if group_name in groups
+    }
+
+    with phase("plan"):
+        planned = run_concurrently(
+            [(target.project_id, target.branch, private_token, prefetch) for _, target in sweep_items],
+            plan_branch_all_users,
+            concurrency,
+        )
+    revocations = []
+    for (group_name, _), (status, project_id, branch, branch_plan, revoked_usernames) in zip(sweep_items, planned):
+        report[group_name]["projects"].add(project_id)
+        if status == "error":
+            # Never read, so neither checked nor safe: a failure, also in a dry run.
+            report[group_name]["failed"] += 1
+            continue
+        report[group_name]["branches_checked"] += 1
+        if branch_plan:
+            report[group_name]["branches_planned"] += 1
+            revocations.append({
+                "group": group_name, "project_id": project_id, "branch": branch, "rules": branch_plan, "users": revoked_usernames,
+            })
+
+    if not plan_only:
+        with phase("revoke"):
+            results = run_concurrently(
+                [(r["project_id"], r["branch"], r["rules"], r["users"], private_token) for r in revocations],
+                apply_branch_all_users,
+                concurrency,
+            )
+        for revocation, outcome in zip(revocations, results):
+            group_report = report[revocation["group"]]
+            if outcome.status == "Success":
+                group_report["revoked"] += 1
+                group_report["users"].update(revocation["users"])
+            else:
+                group_report["failed"] += 1
+
+    for group_report in report.values():
+        group_report["projects"] = len(group_report["projects"])
+        group_report["users"] = sorted(group_report["users"])
+    return revocations, report
 
 
 # MAIN FUNCTION
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="GitLab Protected Branch Access Revocation Tool.")
+# Returns the exit code: 0, or 1 when no group was selected or any branch failed to be read or revoked.
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="GitLab Protected Branch Access Revocation Tool.")
     parser.add_argument('-g', '--gitlab_token', help='GitLab private token')
     parser.add_argument('-j', '--jira_list', type=str, help='Comma-separated list of Jira IDs (e.g., JIRA-1,JIRA-2)')
     parser.add_argument('-f', '--filterid', type=str, help='Jira filter ID to fetch a list of Jiras')
@@ -162,10 +174,39 @@ if __name__ == "__main__":
     parser.add_argument('-s', '--safety', action='store_true', help='Process Safety-repos (Flag)')
     parser.add_argument('-c', '--cp', action='store_true', help='Process CP-repos (Flag)')
     parser.add_argument('-l', '--lims', action='store_true', help='Process LIMS-repos (Flag)')
+    parser.add_argument('-a', '--all_groups', action='store_true', help='Process every group in config.all_repos (Flag)')
+    parser.add_argument('-b', '--branches', nargs="+", help='Release branches to revoke (skips active version discovery)')
+    parser.add_argument('--manifest_file', type=str, help='Read active versions from a saved SCDB manifest file (offline)')
+    parser.add_argument('--manifest_cache_dir', type=str, help='Directory for the cached SCDB manifest (default config.manifest_cache_dir)')
+    parser.add_argument('--prefetch', action='store_true', help='List protected release branches once per project instead of one GET per branch')
+    parser.add_argument('--plan', type=str, help='Dry run: compute the revoke plan with reads only and write it (JSON) to this file')
+    parser.add_argument('--apply_plan', type=str, help='Apply a plan file written by --plan (PATCH calls only)')
+    parser.add_argument('--report_json', type=str, help='Write the aggregated per-group sweep report (JSON) to this file')
+    parser.add_argument('--metrics_json', type=str, help='Write the per-endpoint/per-phase timing report (JSON) to this file')
+    parser.add_argument('--concurrency', type=int, default=config.gitlab_concurrency, help='Number of protected branches revoked concurrently')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    # Per-run state is module-level; start clean so main() can run again in the same process.
+    reset_protected_branch_indexes()
+    reset_request_counts()
+    run_metrics.reset()
     gitlab_private_token = args.gitlab_token
     all_groups = config.all_repos
+
+    if args.apply_plan:
+        saved_plan = load_plan(args.apply_plan)
+        patch_items = [
+            (revocation["project_id"], revocation["branch"], revocation["rules"], revocation.get("users", []), gitlab_private_token)
+            for revocation in saved_plan.get("revocations", [])
+        ]
+        print(f"Applying saved plan with {len(patch_items)} branch revocations.")
+        outcomes = run_concurrently(patch_items, apply_branch_all_users, args.concurrency)
+        failed = [outcome for outcome in outcomes if outcome.status == "error"]
+        print("\n---------------- Plan report ----------------")
+        print(f"{len(outcomes) - len(failed)} branches revoked, {len(failed)} failed.")
+        for outcome in failed:
+            print(f"Failed: project {outcome.project_id}, branch '{outcome.branch}': {outcome.message}")
+        return 1 if failed else 0
     
 
     selected_groups = []
@@ -180,19 +221,42 @@ if __name__ == "__main__":
     if args.lims:
         selected_groups.append("Lims")
 
-    # branches_to_revoke = fetch_active_branches()
-    branches_to_revoke = ['24.3.5']
+    branches_to_revoke = discover_branches(args.branches, args.manifest_file, args.manifest_cache_dir)
     print("Branches need to revoke: ", branches_to_revoke)
 
     all_groups = all_groups[0]
-    
-    for group_name in selected_groups:  # ["DEV" /"Safety" /"CP" /"LIMS"]
-        if group_name in all_groups:
-            repos_list = all_groups[group_name]
-
-            # Revoking for each repository list in the groups
-            print(f"\n\nRevoking the access for {group_name} Repo")
-            for repo in repos_list:
-                print(repos_list)
-                print(repo)
-                # result = revoke_all_access(branches_to_revoke, repo_list, gitlab_private_token)
\ No newline at end of file
+    if args.all_groups:
+        selected_groups = list(all_groups)
+    if not selected_groups:
+        print("No repo group selected. Use -q/-v/-s/-c/-l or -a/--all_groups.")
+        return 1
+
+    print(f"\n\nRevoking the access for {', '.join(selected_groups)} Repos")
+    revocations, sweep_report = sweep_groups(
+        all_groups, selected_groups, branches_to_revoke, gitlab_private_token, args.concurrency, args.prefetch, bool(args.plan)
+    )
+
+    print("\n---------------- Sweep report ----------------")
+    for group_name, group_report in sweep_report.items():
+        print(
+            f"{group_name}: {group_report['projects']} projects, {group_report['branches_checked']} branches checked, "
+            f"{group_report['branches_planned']} with user rules, {group_report['revoked']} revoked, {group_report['failed']} failed. "
+            f"Users revoked: {', '.join(group_report['users']) or '-'}"
+        )
+    if args.report_json:
+        with open(args.report_json, "w") as report_file:
+            json.dump(sweep_report, report_file, indent=2)
+
+    if args.plan:
+        plan_document = build_plan_document(revocations, sum(request_counts().values()), args.concurrency)
+        write_plan(args.plan, plan_document)
+        print(f"Revoke plan written to {args.plan}. Estimate: {plan_document['estimate']}")
+
+    run_metrics.log_summary(emit=print)
+    if args.metrics_json:
+        run_metrics.export_json(args.metrics_json)
+    return 1 if any(group_report["failed"] for group_report in sweep_report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
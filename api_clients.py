@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from run_metrics import record_call
+from rate_limit import backoff_seconds, get_host_scheduler, retry_delay, retry_status_codes, write_retry_status_codes
+
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+_gitlab_clients = {}
+_jira_client = None
+_clients_lock = threading.Lock()
+_response_cache = None
+_request_counts = Counter()
+_request_counts_lock = threading.Lock()
+idempotent_methods = {"GET", "HEAD"}
+
+
+# Caps concurrent requests per host so concurrent runs can't flood Jira or GitLab.
+def host_slot(url):
+    host = urlparse(url).netloc
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(config.max_requests_per_host)
+        return _host_limits[host]
+
+
+# Keep-alive session with a connection pool, so repeated calls reuse the TLS connection.
+class ApiClient:
+    def __init__(self, base_url, pool_size=None):
+        self.base_url = base_url.rstrip("/")
+        pool_size = pool_size or config.http_pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path):
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, **kwargs):
+        url = self.url(path)
+        if method == "GET" and _response_cache is not None:
+            def send(headers):
+                return self._send(method, url, **dict(kwargs, headers=headers))
+            return _response_cache.get(send, url, kwargs.get("params"), kwargs.get("headers"))
+        return self._send(method, url, **kwargs)
+
+    # Sends through the host's rate limiter with the configured timeouts. Reads are retried with
+    # backoff on 429/5xx and connection errors; writes (PATCH) only on 429.
+    def _send(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (config.http_connect_timeout, config.http_read_timeout))
+        idempotent = method in idempotent_methods
+        retry_codes = retry_status_codes if idempotent else write_retry_status_codes
+        scheduler = get_host_scheduler(urlparse(url).netloc)
+        for attempt in range(config.max_retries + 1):
+            scheduler.acquire()
+            with _request_counts_lock:
+                _request_counts[method] += 1
+            started = time.monotonic()
+            try:
+                with host_slot(url):
+                    response = self.session.request(method, url, **kwargs)
+                record_call(method, url, response.status_code, time.monotonic() - started, len(response.content))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not idempotent or attempt == config.max_retries:
+                    raise
+                delay = backoff_seconds(attempt)
+                logging.warning(f"{method} {url} failed ({e}). Retrying in {delay:.1f}s.")
+                time.sleep(delay)
+                continue
+
+            scheduler.observe(response)
+            if response.status_code not in retry_codes or attempt == config.max_retries:
+                return response
+            delay = retry_delay(response, attempt)
+            logging.warning(f"{method} {url} returned {response.status_code}. Retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request("PATCH", path, **kwargs)
+
+    # Yields each page of a GitLab list endpoint, following the X-Next-Page header.
+    # Raises requests.exceptions.HTTPError on a non-200 page.
+    def iter_pages(self, path, params=None):
+        params = dict(params or {})
+        params.setdefault("per_page", config.gitlab_page_size)
+        while True:
+            response = self.get(path, params=params)
+            response.raise_for_status()
+            yield response.json()
+            next_page = response.headers.get("X-Next-Page")
+            if not next_page:
+                break
+            params["page"] = next_page
+
+
+class JiraClient(ApiClient):
+    def __init__(self, base_url=None, username=None, password=None, pool_size=None):
+        super().__init__(base_url or config.jira_api_url, pool_size)
+        self.session.auth = (username or config.username, password or config.password)
+
+
+class GitLabClient(ApiClient):
+    def __init__(self, private_token, base_url=None, pool_size=None):
+        super().__init__(base_url or config.gitlab_api_url, pool_size)
+        self.session.headers.update({"PRIVATE-TOKEN": private_token})
+
+
+# Number of requests actually sent over the network so far, by HTTP method (cache hits excluded).
+def request_counts():
+    with _request_counts_lock:
+        return dict(_request_counts)
+
+
+def reset_request_counts():
+    with _request_counts_lock:
+        _request_counts.clear()
+
+
+# Opt-in persistent cache for Jira and MR-search GETs (see http_cache.py); None turns it off.
+def enable_response_cache(cache_dir):
+    global _response_cache
+    _response_cache = None
+    if cache_dir:
+        from http_cache import ResponseCache
+        _response_cache = ResponseCache(cache_dir)
+
+
+# Shared clients: one Jira session per process and one GitLab session per token.
+def get_jira_client():
+    global _jira_client
+    with _clients_lock:
+        if _jira_client is None:
+            _jira_client = JiraClient()
+        return _jira_client
+
+
+def get_gitlab_client(private_token):
+    with _clients_lock:
+        if private_token not in _gitlab_clients:
+            _gitlab_clients[private_token] = GitLabClient(private_token)
+        return _gitlab_clients[private_token]
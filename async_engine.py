@@ -0,0 +1,25 @@
+import asyncio
+
+import config
+
+
+async def _run_all(work_items, worker, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(item):
+        async with semaphore:
+            return await asyncio.to_thread(worker, *item)
+
+    return await asyncio.gather(*(run_one(item) for item in work_items))
+
+
+# Runs worker(*item) for every work item concurrently, at most `concurrency` at a time.
+# Each worker call does its own GET -> PATCH, so the per-branch order is preserved.
+# Results come back in the same order as work_items.
+def run_concurrently(work_items, worker, concurrency=None):
+    work_items = list(work_items)
+    if concurrency is None:
+        concurrency = config.gitlab_concurrency
+    if concurrency <= 1 or len(work_items) <= 1:
+        return [worker(*item) for item in work_items]
+    return asyncio.run(_run_all(work_items, worker, concurrency))
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from fake_server import FakeData, start_server
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def server_stats(server):
+    with urllib.request.urlopen(f"{server.base_url}/__stats") as response:
+        return json.load(response)
+
+
+# Runs one script as a subprocess against a freshly generated fake server and reports
+# wall time, throughput and the calls the server received.
+def run_scenario(script, script_args, jiras, repos, options, work_dir):
+    data = FakeData(jiras=jiras, repos=repos, users=options.users)
+    server = start_server(data, latency=options.latency, error_rate=options.error_rate, seed=options.seed)
+    repos_file = os.path.join(work_dir, f"repos_{repos}.json")
+    with open(repos_file, "w") as handle:
+        json.dump([{"QA": [{str(project_id): f"repo-{project_id}" for project_id in data.project_ids}]}], handle)
+
+    env = dict(
+        os.environ,
+        REVOKE_JIRA_API_URL=f"{server.base_url}/jira",
+        REVOKE_GITLAB_API_URL=f"{server.base_url}/gitlab",
+        REVOKE_MAX_JIRAS=str(max(jiras, 1)),
+        REVOKE_HOST_RATE_LIMIT=str(options.host_rate_limit),
+        REVOKE_REPOS_FILE=repos_file,
+    )
+    command = [sys.executable, os.path.join(script_dir, script), "-g", "bench-token"] + script_args
+    started = time.monotonic()
+    completed = subprocess.run(command, cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_seconds = time.monotonic() - started
+
+    calls = server_stats(server)
+    server.shutdown()
+    server.server_close()
+    items = jiras if script == "BranchAccessRevoke.py" else repos
+    return {
+        "script": script,
+        "jiras": jiras,
+        "repos": repos,
+        "exit_code": completed.returncode,
+        "wall_seconds": round(wall_seconds, 3),
+        "items_per_second": round(items / wall_seconds, 2) if wall_seconds else None,
+        "total_calls": sum(calls.values()),
+        "calls": calls,
+        "stderr_tail": completed.stderr.strip().splitlines()[-3:] if completed.returncode else [],
+    }
+
+
+def print_result(result):
+    print(
+        f"{result['script']:<22} jiras={result['jiras']:<5} repos={result['repos']:<4} "
+        f"wall={result['wall_seconds']:>8.2f}s  items/s={result['items_per_second']:>8}  "
+        f"calls={result['total_calls']:<6} exit={result['exit_code']}"
+    )
+    for endpoint, count in sorted(result["calls"].items()):
+        print(f"    {count:>6}  {endpoint}")
+    for line in result["stderr_tail"]:
+        print(f"    ! {line}")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Benchmark the revoke scripts against the offline fake server.")
+    parser.add_argument('--jira_scales', type=int, nargs="*", default=[10, 100, 1000], help='Jira counts for BranchAccessRevoke.py')
+    parser.add_argument('--repo_scales', type=int, nargs="*", default=[1, 10, 100], help='Repo counts for Revoke_allrepos.py')
+    parser.add_argument('--users', type=int, default=5, help='Number of distinct assignees in the fake data')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds the fake server adds to every response')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for error injection')
+    parser.add_argument('--host_rate_limit', type=float, default=1000, help='Per-host request rate the scripts may use')
+    parser.add_argument('--jira_args', type=str, default="", help='Extra BranchAccessRevoke.py arguments, e.g. --jira_args="--workers 8 --prefetch"')
+    parser.add_argument('--repo_args', type=str, default="", help='Extra Revoke_allrepos.py arguments, e.g. --repo_args="--prefetch --concurrency 8"')
+    parser.add_argument('--json', type=str, help='Write all results (JSON) to this file')
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for jiras in args.jira_scales:
+            result = run_scenario("BranchAccessRevoke.py", ["-f", "bench"] + shlex.split(args.jira_args), jiras, 1, args, work_dir)
+            print_result(result)
+            results.append(result)
+        for repos in args.repo_scales:
+            result = run_scenario("Revoke_allrepos.py", ["-q", "-b", "24.3.5"] + shlex.split(args.repo_args), 0, repos, args, work_dir)
+            print_result(result)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+    # Nonzero when any scenario's script failed.
+    return 1 if any(result["exit_code"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
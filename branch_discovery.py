@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import time
+
+import requests
+
+import config
+from api_clients import ApiClient
+
+internal_releases = ['1.1', '2.1', '3.1']
+
+
+def is_internal_release(version):
+    parts = version.split('.')
+    if len(parts) < 3:
+        return False
+    sprint_patch = f"{parts[1]}.{parts[2]}"
+    return sprint_patch in internal_releases
+
+
+def get_base_sprint(version):
+    parts = version.split('.')
+    return f"{parts[0]}.{parts[1]}"
+
+
+# Picks the release branches to lock from the SCDB pipeline versions (newest first):
+# - newest is an internal release: the three newest versions
+# - second newest is internal: the newest plus the third and fourth
+# - otherwise: the two newest plus the sprint's x.0 release if it is still active
+def select_target_branches(pipeline_versions):
+    if not pipeline_versions:
+        return []
+    if is_internal_release(pipeline_versions[0]):
+        return pipeline_versions[:3]
+    if len(pipeline_versions) > 1 and is_internal_release(pipeline_versions[1]):
+        return [pipeline_versions[0]] + pipeline_versions[2:4]
+
+    target_branches = pipeline_versions[:2]
+    target_x0_version = f"{get_base_sprint(pipeline_versions[0])}.0"
+    if target_x0_version in pipeline_versions and target_x0_version not in target_branches:
+        target_branches.append(target_x0_version)
+    return target_branches
+
+
+def _read_manifest(path):
+    with open(path) as manifest_file:
+        return json.load(manifest_file)
+
+
+def _write_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+    # Atomic swap, so concurrent sweeps never read a half-written manifest.
+    os.replace(temp_path, path)
+
+
+# Returns the SCDB active_versions manifest: from manifest_file when given (offline), else from the
+# local cache while it is younger than ttl, else fetched live and cached. A failed fetch falls back
+# to the stale cache, then to an empty pipeline.
+def load_manifest(manifest_file=None, cache_dir=None, ttl=None):
+    if manifest_file:
+        logging.info(f"Reading active versions from {manifest_file} (offline).")
+        return _read_manifest(manifest_file)
+
+    cache_path = os.path.join(cache_dir or config.manifest_cache_dir, "active_versions.json")
+    ttl = config.manifest_ttl_seconds if ttl is None else ttl
+    if os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < ttl:
+        logging.info(f"Using cached active versions from {cache_path}.")
+        return _read_manifest(cache_path)
+
+    try:
+        response = ApiClient(config.active_versions_url).get("")
+        response.raise_for_status()
+        manifest = response.json()
+        _write_manifest(cache_path, manifest)
+        return manifest
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Error fetching live data ({e}). Could not retrieve data from API.")
+        if os.path.exists(cache_path):
+            logging.warning(f"Falling back to stale active versions cache {cache_path}.")
+            return _read_manifest(cache_path)
+        return {"pipeline": []}
+
+
+# Branch sources, in order of precedence: an explicit list, then the manifest (file, cache or live).
+def discover_branches(branches=None, manifest_file=None, cache_dir=None, ttl=None):
+    if branches:
+        return list(branches)
+    manifest = load_manifest(manifest_file, cache_dir, ttl)
+    pipeline_versions = [item["name"] for item in manifest.get("pipeline", [])]
+    return select_target_branches(pipeline_versions)
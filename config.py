@@ -1,9 +1,46 @@
-gitlab_api_url = "https://gitlab.veevadev.com/api/v4"
-jira_api_url = "https://jira.veevadev.com/rest/api/2"
+import json
+import os
+
+# The REVOKE_* environment variables point the scripts at another server (e.g. fake_server.py for benchmarks).
+gitlab_api_url = os.environ.get("REVOKE_GITLAB_API_URL", "https://gitlab.veevadev.com/api/v4")
+jira_api_url = os.environ.get("REVOKE_JIRA_API_URL", "https://jira.veevadev.com/rest/api/2")
 project_search_all = "/merge_requests?scope=all&state=merged&in=title&search_type=advanced&search=" 
 username = "VaultApiUser"
 password = "woozle11"
-max_Jiras = 100
+max_Jiras = int(os.environ.get("REVOKE_MAX_JIRAS", 100))
+jira_page_size = 100
+max_requests_per_host = 4
+gitlab_concurrency = 4
+http_pool_size = 10
+# Seconds to wait for a connection and for each read of a response; a hung server no longer stalls a worker.
+http_connect_timeout = 5
+http_read_timeout = 30
+# Request scheduling: per-host token bucket (requests/second) and retry policy for 429/5xx.
+host_rate_limit = float(os.environ.get("REVOKE_HOST_RATE_LIMIT", 10))
+host_min_rate = 0.5
+max_retries = 4
+retry_backoff_seconds = 0.5
+retry_backoff_max_seconds = 30
+gitlab_page_size = 100
+# Average seconds per Jira/GitLab call seen in production logs; used for plan estimates.
+estimated_call_seconds = 0.8
+# Seconds a cached GET stays fresh, per resource type (only used with --cache_dir).
+cache_ttls = {
+    "jira_issue": 600,
+    "jira_closed_issue": 30 * 24 * 3600,
+    "jira_search": 300,
+    "gitlab_merge_requests": 3600,
+    "gitlab_users": 7 * 24 * 3600,
+}
+# SCDB manifest of active release versions, cached locally by branch_discovery.py.
+active_versions_url = "https://scdb.vaultdev.com/default/latest/manifest/active_versions"
+manifest_cache_dir = ".revoke_cache"
+manifest_ttl_seconds = 3600
+# --watch: seconds between Jira polls, and how far each poll re-reads behind the high-water mark.
+watch_poll_seconds = 300
+watch_overlap_minutes = 1
+# Local index of merged MRs by Jira key, filled by mr_webhook.py (BranchAccessRevoke.py --mr_index).
+mr_index_path = os.path.join(manifest_cache_dir, "mr_index.sqlite3")
 default_repo = {2939:'automation-platform-pipelines'}
 all_repos = [
     {
@@ -39,4 +76,6 @@ all_repos = [
         # ]
     }
 ]
-
+if os.environ.get("REVOKE_REPOS_FILE"):
+    with open(os.environ["REVOKE_REPOS_FILE"]) as repos_file:
+        all_repos = json.load(repos_file)
@@ -0,0 +1,261 @@
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Offline stand-in for the Jira and GitLab endpoints the revoke scripts use:
+#   Jira:   GET /jira/issue/{key}, GET /jira/search
+#   GitLab: GET /gitlab/merge_requests, GET /gitlab/projects/{id}/merge_requests,
+#           GET /gitlab/projects/{id}/protected_branches[/{name}], PATCH /gitlab/projects/{id}/protected_branches/{name}
+# Point the scripts at it with REVOKE_JIRA_API_URL=http://host:port/jira and
+# REVOKE_GITLAB_API_URL=http://host:port/gitlab. GET /__stats returns call counts, POST /__reset clears them.
+
+default_branches = ["24.3.5", "25.3.0", "25.3.2"]
+
+
+# Generated data set: `jiras` Closed DEV issues assigned round-robin to `users` users, one merged
+# release MR per Jira spread over `repos` projects, and every project's release branches protected
+# with a push and merge rule per user.
+class FakeData:
+    def __init__(self, jiras=10, repos=1, users=5, branches=None, first_project_id=1000):
+        self.branches = branches or default_branches
+        self.project_ids = [first_project_id + i for i in range(repos)]
+        self.issues = {}
+        self.merge_requests = []
+        for i in range(1, jiras + 1):
+            key = f"DEV-{i}"
+            user = i % users
+            branch = self.branches[i % len(self.branches)]
+            self.issues[key] = {
+                "key": key,
+                "fields": {
+                    "assignee": {"displayName": f"User {user}", "emailAddress": f"user{user}@example.com"},
+                    "status": {"name": "Closed"},
+                    "fixVersions": [{"name": branch.replace(".", "R")}],
+                    "updated": "2025-11-24T19:05:49.000+0000",
+                },
+            }
+            project_id = self.project_ids[i % repos]
+            self.merge_requests.append({
+                "iid": i,
+                "title": f"{key} Fix for release {branch}",
+                "state": "merged",
+                "target_project_id": project_id,
+                "project_id": project_id,
+                "target_branch": f"release/{branch}",
+                "web_url": f"https://gitlab.example.com/group/repo-{project_id}/-/merge_requests/{i}",
+                "updated_at": "2025-11-24T19:05:49.000Z",
+            })
+        self.users = [{"id": 100 + user, "username": f"user{user}", "name": f"User {user}"} for user in range(users)]
+        self.protected_branches = {}
+        rule_id = 1
+        for project_id in self.project_ids:
+            for branch in self.branches:
+                levels = {}
+                for levels_key in ("push_access_levels", "merge_access_levels", "unprotect_access_levels"):
+                    levels[levels_key] = []
+                    if levels_key == "unprotect_access_levels":
+                        continue
+                    for user in self.users:
+                        levels[levels_key].append({
+                            "id": rule_id, "user_id": user["id"], "group_id": None,
+                            "access_level": 40, "access_level_description": user["name"],
+                        })
+                        rule_id += 1
+                self.protected_branches[(project_id, f"release/{branch}")] = {"name": f"release/{branch}", **levels}
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, data, latency=0.0, error_rate=0.0, max_page_size=100, seed=0):
+        super().__init__(address, FakeHandler)
+        self.data = data
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_page_size = max_page_size
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        # Endpoints ("GET /gitlab/projects/{id}/protected_branches/{branch}") that always answer 500.
+        self.failing_endpoints = set()
+        self.lock = threading.Lock()
+
+    # A client that timed out has hung up by the time the response is written; that's not a server error.
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def _jql_keys(jql):
+    match = re.search(r"key\s+in\s*\(([^)]*)\)", jql, re.IGNORECASE)
+    if not match:
+        return None
+    return [key.strip().strip('"') for key in match.group(1).split(",") if key.strip()]
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_page(self, items, query):
+        per_page = min(int(query.get("per_page", 20)), self.server.max_page_size)
+        page = int(query.get("page", 1))
+        start = (page - 1) * per_page
+        next_page = page + 1 if start + per_page < len(items) else ""
+        headers = {"X-Page": page, "X-Per-Page": per_page, "X-Total": len(items), "X-Next-Page": next_page}
+        self.send_json(200, items[start:start + per_page], headers)
+
+    # Counts the call, applies the configured latency and injects 503s at the configured rate.
+    def begin(self, method, path):
+        with self.server.lock:
+            self.server.calls[f"{method} {path}"] += 1
+            fail = self.server.random.random() < self.server.error_rate
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if fail:
+            self.send_json(503, {"message": "injected failure"}, {"Retry-After": 0})
+            return False
+        if f"{method} {path}" in self.server.failing_endpoints:
+            self.send_json(500, {"message": "500 Internal Server Error"})
+            return False
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        path = unquote(url.path)
+        data = self.server.data
+
+        if path == "/__stats":
+            with self.server.lock:
+                return self.send_json(200, dict(self.server.calls))
+
+        endpoint = re.sub(r"/issue/.+$", "/issue/{key}", path)
+        endpoint = re.sub(r"/protected_branches/.+$", "/protected_branches/{branch}", endpoint)
+        endpoint = re.sub(r"/projects/\d+", "/projects/{id}", endpoint)
+        if not self.begin("GET", endpoint):
+            return
+
+        match = re.fullmatch(r"/jira/issue/(.+)", path)
+        if match:
+            issue = data.issues.get(match.group(1))
+            return self.send_json(200, issue) if issue else self.send_json(404, {"errorMessages": ["Issue Does Not Exist"]})
+
+        if path == "/jira/search":
+            keys = _jql_keys(query.get("jql", ""))
+            if keys is not None and any(key not in data.issues for key in keys):
+                return self.send_json(400, {"errorMessages": ["An issue key in the query does not exist."]})
+            issues = [data.issues[key] for key in (keys if keys is not None else data.issues)]
+            start_at = int(query.get("startAt", 0))
+            max_results = min(int(query.get("maxResults", 50)), self.server.max_page_size)
+            return self.send_json(200, {
+                "startAt": start_at, "maxResults": max_results, "total": len(issues),
+                "issues": issues[start_at:start_at + max_results],
+            })
+
+        if path == "/gitlab/merge_requests":
+            pattern = re.compile(rf"\b{re.escape(query.get('search', ''))}\b")
+            return self.send_page([mr for mr in data.merge_requests if pattern.search(mr["title"])], query)
+
+        match = re.fullmatch(r"/gitlab/projects/(\d+)/merge_requests", path)
+        if match:
+            project_id = int(match.group(1))
+            return self.send_page([mr for mr in data.merge_requests if mr["project_id"] == project_id], query)
+
+        if path == "/gitlab/users":
+            search = query.get("search", "").lower()
+            return self.send_page([user for user in data.users if search in user["name"].lower() or search in user["username"]], query)
+
+        match = re.fullmatch(r"/gitlab/projects/(\d+)/protected_branches", path)
+        if match:
+            project_id = int(match.group(1))
+            search = query.get("search", "")
+            branches = [
+                branch for (branch_project, name), branch in sorted(data.protected_branches.items())
+                if branch_project == project_id and search in name
+            ]
+            return self.send_page(branches, query)
+
+        match = re.fullmatch(r"/gitlab/projects/(\d+)/protected_branches/(.+)", path)
+        if match:
+            branch = data.protected_branches.get((int(match.group(1)), match.group(2)))
+            return self.send_json(200, branch) if branch else self.send_json(404, {"message": "404 Not found"})
+
+        self.send_json(404, {"message": "404 Not found"})
+
+    def do_PATCH(self):
+        path = unquote(urlparse(self.path).path)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.begin("PATCH", re.sub(r"/projects/\d+/protected_branches/.+$", "/projects/{id}/protected_branches/{branch}", path)):
+            return
+
+        match = re.fullmatch(r"/gitlab/projects/(\d+)/protected_branches/(.+)", path)
+        branch = match and self.server.data.protected_branches.get((int(match.group(1)), match.group(2)))
+        if not branch:
+            return self.send_json(404, {"message": "404 Not found"})
+
+        # Like GitLab, destroying a rule ID the branch doesn't have fails the whole PATCH.
+        with self.server.lock:
+            destroyed = {}
+            for patch_field, levels_key in (("allowed_to_push", "push_access_levels"),
+                                            ("allowed_to_merge", "merge_access_levels"),
+                                            ("allowed_to_unprotect", "unprotect_access_levels")):
+                destroyed[levels_key] = {rule["id"] for rule in body.get(patch_field, []) if rule.get("_destroy")}
+                if destroyed[levels_key] - {rule["id"] for rule in branch[levels_key]}:
+                    return self.send_json(404, {"message": "404 Not found"})
+            for levels_key, rule_ids in destroyed.items():
+                branch[levels_key] = [rule for rule in branch[levels_key] if rule["id"] not in rule_ids]
+            body = json.loads(json.dumps(branch))
+        self.send_json(200, body)
+
+    def do_POST(self):
+        if urlparse(self.path).path == "/__reset":
+            with self.server.lock:
+                self.server.calls.clear()
+            return self.send_json(200, {})
+        self.send_json(404, {"message": "404 Not found"})
+
+
+def start_server(data, host="127.0.0.1", port=0, **options):
+    server = FakeServer((host, port), data, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Jira/GitLab stand-in for the revoke scripts.")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--jiras', type=int, default=10, help='Number of Closed DEV Jiras to serve')
+    parser.add_argument('--repos', type=int, default=1, help='Number of GitLab projects to serve')
+    parser.add_argument('--users', type=int, default=5, help='Number of distinct assignees')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--max_page_size', type=int, default=100, help='Largest page the server will return')
+    args = parser.parse_args()
+
+    fake_data = FakeData(jiras=args.jiras, repos=args.repos, users=args.users)
+    server = FakeServer(("127.0.0.1", args.port), fake_data, latency=args.latency,
+                        error_rate=args.error_rate, max_page_size=args.max_page_size)
+    print(f"Serving Jira at {server.base_url}/jira and GitLab at {server.base_url}/gitlab (projects {fake_data.project_ids[0]}..{fake_data.project_ids[-1]})")
+    server.serve_forever()
@@ -0,0 +1,107 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import config
+
+
+# Resource type of a GET, used to pick its TTL. Protected branches are never cached:
+# revoke decisions must always be made on live rules.
+def resource_type(url):
+    if "/protected_branches" in url:
+        return None
+    if "/issue/" in url:
+        return "jira_issue"
+    if "/search" in url and "/merge_requests" not in url:
+        return "jira_search"
+    if "/merge_requests" in url:
+        return "gitlab_merge_requests"
+    if "/users" in url:
+        return "gitlab_users"
+    return None
+
+
+def ttl_for(kind, body):
+    if kind == "jira_issue":
+        try:
+            status = json.loads(body).get('fields', {}).get('status', {}).get('name')
+        except ValueError:
+            status = None
+        if status in ('Closed', 'Resolved'):
+            return config.cache_ttls["jira_closed_issue"]
+    return config.cache_ttls[kind]
+
+
+def _cached_response(url, status_code, body, headers):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response._content = body
+    response.headers = CaseInsensitiveDict(json.loads(headers))
+    response.encoding = "utf-8"
+    return response
+
+
+# On-disk cache of Jira/GitLab GET responses (SQLite), with a TTL per resource type and
+# ETag revalidation once an entry has expired.
+class ResponseCache:
+    def __init__(self, cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "http_cache.sqlite3"), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, status INTEGER, body BLOB, headers TEXT, etag TEXT, expires_at REAL)"
+            )
+
+    @staticmethod
+    def make_key(method, url, params):
+        return json.dumps([method, url, sorted((params or {}).items())], default=str)
+
+    def lookup(self, key):
+        with self._lock:
+            return self._db.execute(
+                "SELECT url, status, body, headers, etag, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+    def store(self, key, kind, response):
+        expires_at = time.time() + ttl_for(kind, response.content)
+        headers = json.dumps(dict(response.headers))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, response.content, headers, response.headers.get("ETag"), expires_at),
+            )
+
+    def refresh(self, key, kind, body):
+        with self._lock, self._db:
+            self._db.execute("UPDATE responses SET expires_at = ? WHERE key = ?", (time.time() + ttl_for(kind, body), key))
+
+    # Serves a GET from the cache while fresh; once expired, revalidates with If-None-Match when an ETag is known.
+    def get(self, send, url, params, headers):
+        kind = resource_type(url)
+        if kind is None:
+            return send(headers)
+
+        key = self.make_key("GET", url, params)
+        cached = self.lookup(key)
+        if cached:
+            cached_url, status, body, cached_headers, etag, expires_at = cached
+            if expires_at > time.time():
+                return _cached_response(cached_url, status, body, cached_headers)
+            if etag:
+                headers = dict(headers or {}, **{"If-None-Match": etag})
+
+        response = send(headers)
+        if cached and response.status_code == 304:
+            self.refresh(key, kind, cached[2])
+            return _cached_response(cached[0], cached[1], cached[2], cached[3])
+        if response.status_code == 200:
+            self.store(key, kind, response)
+        return response
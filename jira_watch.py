@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+import config
+
+jira_timestamp_format = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+
+def parse_jira_timestamp(value):
+    return datetime.strptime(value, jira_timestamp_format)
+
+
+# State of --watch, kept on disk between cycles (and restarts):
+#   high_water_mark: newest `updated` timestamp processed so far
+#   processed:       {jira: updated} for issues handled inside the overlap window; JQL `updated >=`
+#                    is minute-granular, so the boundary is re-read and these are skipped
+#   failed:          Jiras that ended in error, retried on the next cycle
+class WatchState:
+    def __init__(self, path):
+        self.path = path
+        self.high_water_mark = None
+        self.processed = {}
+        self.failed = []
+        if os.path.exists(path):
+            with open(path) as state_file:
+                state = json.load(state_file)
+            self.high_water_mark = state.get("high_water_mark")
+            self.processed = state.get("processed", {})
+            self.failed = state.get("failed", [])
+
+    # JQL for one cycle: only Closed/Resolved issues of the filter updated since the mark (minus the overlap).
+    def build_jql(self, filterid):
+        jql = f"filter={filterid} AND status in (Closed, Resolved)"
+        if self.high_water_mark:
+            since = parse_jira_timestamp(self.high_water_mark) - timedelta(minutes=config.watch_overlap_minutes)
+            jql += f' AND updated >= "{since:%Y/%m/%d %H:%M}"'
+        return jql + " ORDER BY updated ASC"
+
+    # Jiras to run this cycle (issues are IssueInfos): earlier failures first, so a capped cycle
+    # can't starve them, then issues new or changed since last processed.
+    def pending(self, issues):
+        jira_list = list(self.failed)
+        for issue in issues:
+            if self.processed.get(issue.key) != issue.updated and issue.key not in jira_list:
+                jira_list.append(issue.key)
+        return jira_list
+
+    # Moves the mark past every processed issue and forgets entries older than the overlap window.
+    # Failures that didn't make this cycle's cap stay queued for the next one.
+    def advance(self, issues, results_summary):
+        updated = {issue.key: issue.updated for issue in issues}
+        ran = {result["Jira"] for result in results_summary}
+        self.failed = [jira_id for jira_id in self.failed if jira_id not in ran] + [
+            result["Jira"] for result in results_summary if result["Outcome"] == "error"
+        ]
+        for result in results_summary:
+            jira_id = result["Jira"]
+            if result["Outcome"] != "error" and updated.get(jira_id):
+                self.processed[jira_id] = updated[jira_id]
+                if not self.high_water_mark or parse_jira_timestamp(updated[jira_id]) > parse_jira_timestamp(self.high_water_mark):
+                    self.high_water_mark = updated[jira_id]
+
+        if self.high_water_mark:
+            cutoff = parse_jira_timestamp(self.high_water_mark) - timedelta(minutes=config.watch_overlap_minutes)
+            self.processed = {
+                jira_id: value for jira_id, value in self.processed.items()
+                if parse_jira_timestamp(value) >= cutoff
+            }
+
+    def save(self):
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as state_file:
+            json.dump({"high_water_mark": self.high_water_mark, "processed": self.processed, "failed": self.failed}, state_file, indent=2)
+        # Atomic swap, so a watcher killed mid-write keeps the previous mark.
+        os.replace(temp_path, self.path)
+        logging.info(f"Watch high-water mark {self.high_water_mark} saved to {self.path}.")
@@ -0,0 +1,74 @@
+import argparse
+import logging
+
+import requests
+
+import config
+from api_clients import get_gitlab_client
+from async_engine import run_concurrently
+from mr_index import MergeRequestIndex
+
+# Bulk alternative to the per-Jira MR search: pages through each configured project's merged MRs
+# (oldest update first, from the project's stored updated_after cursor) and records every release
+# MR under the Jira keys in its title. Runs after the first only read what changed since.
+
+
+def configured_projects(selected_groups=None):
+    project_ids = set(config.default_repo)
+    for group_name, repo_lists in config.all_repos[0].items():
+        if selected_groups and group_name not in selected_groups:
+            continue
+        for repo_list in repo_lists:
+            project_ids.update(int(project_id) for project_id in repo_list)
+    return sorted(project_ids)
+
+
+# Crawls one project; the cursor is saved after every page, so an interrupted crawl resumes there.
+# Returns (project_id, status, release MRs indexed).
+def crawl_project(merge_request_index, project_id, private_token, full=False):
+    params = {"state": "merged", "order_by": "updated_at", "sort": "asc"}
+    cursor = None if full else merge_request_index.get_cursor(project_id)
+    if cursor:
+        params["updated_after"] = cursor
+    logging.info(f"Crawling merged MRs of project {project_id} updated after {cursor or 'the beginning'}.")
+
+    indexed = 0
+    try:
+        for page in get_gitlab_client(private_token).iter_pages(f"/projects/{project_id}/merge_requests", params):
+            for merge_request in page:
+                # GitLab cannot filter target_branch by prefix; the index keeps only release/* targets.
+                if merge_request_index.add(merge_request):
+                    indexed += 1
+            if page and page[-1].get("updated_at"):
+                merge_request_index.set_cursor(project_id, page[-1]["updated_at"])
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Failed to crawl merged MRs of project {project_id}: {e}")
+        return project_id, "error", indexed
+    logging.info(f"Indexed {indexed} merged release MRs from project {project_id}.")
+    return project_id, "Success", indexed
+
+
+def crawl_projects(merge_request_index, project_ids, private_token, concurrency=None, full=False):
+    work_items = [(merge_request_index, project_id, private_token, full) for project_id in project_ids]
+    return run_concurrently(work_items, crawl_project, concurrency)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Index merged release MRs of the configured projects by Jira key.")
+    parser.add_argument('-g', '--gitlab_token', help='GitLab private token', required=True)
+    parser.add_argument('--groups', nargs="+", help='Only crawl these config.all_repos groups (default: all)')
+    parser.add_argument('-p', '--projects', type=int, nargs="+", help='Crawl these project IDs instead of the configured ones')
+    parser.add_argument('--index', type=str, default=config.mr_index_path, help='SQLite MR index file')
+    parser.add_argument('--full', action='store_true', help='Ignore the stored cursors and crawl every merged MR again')
+    parser.add_argument('--concurrency', type=int, default=config.gitlab_concurrency, help='Number of projects crawled concurrently')
+    args = parser.parse_args()
+
+    merge_request_index = MergeRequestIndex(args.index)
+    project_ids = args.projects or configured_projects(args.groups)
+    results = crawl_projects(merge_request_index, project_ids, args.gitlab_token, args.concurrency, args.full)
+    failed = [project_id for project_id, status, _ in results if status == "error"]
+    logging.info(f"Crawled {len(project_ids)} projects, indexed {sum(indexed for _, _, indexed in results)} release MRs into {args.index}.")
+    if failed:
+        logging.error(f"Failed projects: {failed}")
+        exit(1)
@@ -0,0 +1,106 @@
+import os
+import re
+import sqlite3
+import threading
+
+import config
+
+jira_key_pattern = re.compile(r"\b([A-Z][A-Z0-9]+-\d+)\b")
+
+
+def jira_keys_in(title):
+    return sorted(set(jira_key_pattern.findall(title or "")))
+
+
+# Normalises a GitLab "Merge Request Hook" payload into the REST merge-request shape that
+# get_branch_project_map reads (target_project_id, target_branch, web_url, title, ...).
+def merge_request_from_hook(payload):
+    attributes = payload.get("object_attributes") or {}
+    return {
+        "iid": attributes.get("iid"),
+        "title": attributes.get("title"),
+        "state": attributes.get("state"),
+        "target_project_id": attributes.get("target_project_id") or (payload.get("project") or {}).get("id"),
+        "target_branch": attributes.get("target_branch"),
+        "web_url": attributes.get("url"),
+        "updated_at": attributes.get("updated_at"),
+    }
+
+
+# Local store of merged MRs (SQLite), keyed by the Jira keys in their titles. Filled by the
+# webhook receiver (mr_webhook.py) and the per-project crawler (mr_crawler.py), and read by the
+# branch-map step before it falls back to MR search. Crawl cursors live in the same file.
+class MergeRequestIndex:
+    def __init__(self, path=None):
+        path = path or config.mr_index_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._preloaded = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS merge_requests ("
+                "jira TEXT, project_id INTEGER, iid INTEGER, title TEXT, target_branch TEXT, web_url TEXT, updated_at TEXT, "
+                "PRIMARY KEY (jira, project_id, iid))"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS crawl_cursors (project_id INTEGER PRIMARY KEY, updated_after TEXT)")
+
+    # Indexes one merged release MR under every Jira key in its title; returns those keys.
+    # Unmerged MRs and other target branches (master, feature/*) are ignored: a Jira found in the
+    # index skips MR search, so the index only holds what the branch map can use.
+    def add(self, merge_request):
+        if merge_request.get("state") != "merged" or not merge_request.get("target_project_id"):
+            return []
+        if not (merge_request.get("target_branch") or "").startswith("release/"):
+            return []
+        jira_keys = jira_keys_in(merge_request.get("title"))
+        rows = [
+            (jira, merge_request["target_project_id"], merge_request.get("iid"), merge_request.get("title"),
+             merge_request.get("target_branch"), merge_request.get("web_url"), merge_request.get("updated_at"))
+            for jira in jira_keys
+        ]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO merge_requests VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return jira_keys
+
+    # Merged MRs recorded for each Jira in one query: {jira: [merge requests]}, in the REST
+    # merge-request shape, ordered by project.
+    def lookup_many(self, jira_ids):
+        jira_ids = list(dict.fromkeys(jira_ids))
+        merge_requests = {jira_id: [] for jira_id in jira_ids}
+        if not jira_ids:
+            return merge_requests
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT jira, project_id, iid, title, target_branch, web_url, updated_at FROM merge_requests "
+                f"WHERE jira IN ({','.join('?' * len(jira_ids))}) ORDER BY project_id, iid", jira_ids
+            ).fetchall()
+        for jira, project_id, iid, title, target_branch, web_url, updated_at in rows:
+            merge_requests[jira].append({
+                "target_project_id": project_id, "iid": iid, "title": title, "state": "merged",
+                "target_branch": target_branch, "web_url": web_url, "updated_at": updated_at,
+            })
+        return merge_requests
+
+    # Loads every Jira of a run in one pass; lookup() then answers from memory.
+    def preload(self, jira_ids):
+        self._preloaded = self.lookup_many(jira_ids)
+
+    def lookup(self, jira_id):
+        if self._preloaded is not None and jira_id in self._preloaded:
+            return self._preloaded[jira_id]
+        return self.lookup_many([jira_id])[jira_id]
+
+    def get_cursor(self, project_id):
+        with self._lock:
+            row = self._db.execute("SELECT updated_after FROM crawl_cursors WHERE project_id = ?", (project_id,)).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, project_id, updated_after):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO crawl_cursors VALUES (?, ?)", (project_id, updated_after))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
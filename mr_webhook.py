@@ -0,0 +1,104 @@
+import argparse
+import hmac
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+from mr_index import MergeRequestIndex, merge_request_from_hook
+
+# Receiver for GitLab "Merge Request Hook" webhooks: every merged MR is written to the local
+# MR index, so BranchAccessRevoke.py --mr_index can map Jiras to projects/branches without the
+# MR search call. Point a GitLab project or group webhook (merge request events) at
+# http://host:port/ and give it the --secret as its token. It listens on 127.0.0.1 unless
+# --host says otherwise, and any other address requires --secret.
+# --record appends each accepted payload to a JSONL file; --replay feeds such a file (or a
+# JSON array of payloads) back into the index without any HTTP server.
+
+
+# Indexes one webhook payload; returns the Jira keys it was stored under ([] if ignored).
+def index_payload(merge_request_index, payload):
+    if payload.get("object_kind") != "merge_request":
+        return []
+    return merge_request_index.add(merge_request_from_hook(payload))
+
+
+def load_payloads(path):
+    with open(path) as payload_file:
+        text = payload_file.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def replay_payloads(merge_request_index, path):
+    indexed = 0
+    for payload in load_payloads(path):
+        if index_payload(merge_request_index, payload):
+            indexed += 1
+    logging.info(f"Replayed {path}: indexed {indexed} merged MRs.")
+    return indexed
+
+
+class WebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, merge_request_index, secret=None, record_path=None):
+        super().__init__(address, WebhookHandler)
+        self.merge_request_index = merge_request_index
+        self.secret = secret
+        self.record_path = record_path
+        self.lock = threading.Lock()
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        if self.server.secret and not hmac.compare_digest(self.headers.get("X-Gitlab-Token", ""), self.server.secret):
+            return self.reply(401, {"message": "invalid token"})
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self.reply(400, {"message": "invalid JSON"})
+
+        jira_keys = index_payload(self.server.merge_request_index, payload)
+        if self.server.record_path:
+            with self.server.lock, open(self.server.record_path, "a") as record_file:
+                record_file.write(json.dumps(payload) + "\n")
+        if jira_keys:
+            logging.info(f"Indexed merged MR {payload['object_attributes'].get('url')} for {jira_keys}.")
+        # GitLab only needs a 2xx; anything not indexed is acknowledged and ignored.
+        self.reply(200, {"indexed": jira_keys})
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="GitLab merge-request webhook receiver for the local MR index.")
+    parser.add_argument('--host', type=str, default="127.0.0.1", help='Address to listen on (anything but localhost needs --secret)')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--index', type=str, default=config.mr_index_path, help='SQLite MR index file')
+    parser.add_argument('--secret', type=str, help='Expected X-Gitlab-Token header')
+    parser.add_argument('--record', type=str, help='Append every received payload (JSONL) to this file')
+    parser.add_argument('--replay', type=str, help='Index recorded payloads from this file and exit')
+    args = parser.parse_args()
+    if not args.replay and not args.secret and args.host not in ("127.0.0.1", "localhost", "::1"):
+        parser.error(f"--secret is required when listening on {args.host}")
+
+    merge_request_index = MergeRequestIndex(args.index)
+    if args.replay:
+        replay_payloads(merge_request_index, args.replay)
+    else:
+        server = WebhookServer((args.host, args.port), merge_request_index, secret=args.secret, record_path=args.record)
+        logging.info(f"Listening for GitLab merge request hooks on {args.host}:{args.port}, indexing into {args.index}.")
+        server.serve_forever()
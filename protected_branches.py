@@ -0,0 +1,72 @@
+import logging
+import threading
+
+import requests
+
+from api_clients import get_gitlab_client
+
+_branch_indexes = {}
+_index_locks = {}
+_index_locks_guard = threading.Lock()
+
+
+def _index_lock(key):
+    with _index_locks_guard:
+        if key not in _index_locks:
+            _index_locks[key] = threading.Lock()
+        return _index_locks[key]
+
+
+# Lists a project's protected release branches once (all pages) and indexes them by branch name.
+# Branches of the same project share the index, so GitLab reads are one listing per project.
+def get_protected_branch_index(project_id, private_token, search="release/"):
+    key = (private_token, project_id, search)
+    with _index_lock(key):
+        if key in _branch_indexes:
+            return "Success", _branch_indexes[key]
+
+        branch_index = {}
+        try:
+            gitlab_client = get_gitlab_client(private_token)
+            for page in gitlab_client.iter_pages(f"/projects/{project_id}/protected_branches", {"search": search}):
+                for protected_branch in page:
+                    branch_index[protected_branch.get('name')] = protected_branch
+        except requests.exceptions.RequestException as e:
+            error_message = f"Failed to list protected branches for project {project_id}: {e}"
+            logging.error(error_message)
+            return "error", error_message
+
+        logging.info(f"Indexed {len(branch_index)} protected '{search}' branches in project {project_id}.")
+        _branch_indexes[key] = branch_index
+        return "Success", branch_index
+
+
+# Replaces a branch in the cached indexes of its project with the JSON a PATCH returned, so later
+# plans against the index don't re-destroy rules that are already gone.
+def update_protected_branch(project_id, private_token, protected_branch):
+    name = protected_branch.get('name')
+    for key in [key for key in list(_branch_indexes) if key[:2] == (private_token, project_id)]:
+        with _index_lock(key):
+            if key in _branch_indexes and name and name.startswith(key[2]):
+                _branch_indexes[key][name] = protected_branch
+
+
+# Forgets every indexed project, e.g. between --watch cycles, so branches are listed afresh.
+def reset_protected_branch_indexes():
+    with _index_locks_guard:
+        _branch_indexes.clear()
+
+
+# Returns the protected branch JSON for release/{branch}, or None when the branch isn't protected.
+# With prefetch the answer comes from the project index; otherwise (or if the listing failed) one GET.
+def get_protected_branch(project_id, branch, private_token, prefetch=False):
+    if prefetch:
+        index_status, branch_index = get_protected_branch_index(project_id, private_token)
+        if index_status == "Success":
+            return branch_index.get(f"release/{branch}")
+
+    response = get_gitlab_client(private_token).get(f"/projects/{project_id}/protected_branches/release%2F{branch}")
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
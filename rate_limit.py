@@ -0,0 +1,94 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import config
+
+# Responses worth retrying: throttled or a transient server-side failure.
+retry_status_codes = {429, 500, 502, 503, 504}
+# For writes only a 429 is retried: GitLab refused it before doing anything. After a 5xx or a
+# dropped connection the PATCH may have been applied, and its rule IDs would be gone on a retry.
+write_retry_status_codes = {429}
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def _retry_after_seconds(value):
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+def _int_header(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+# Token bucket for one host. The refill rate starts at config.host_rate_limit and adapts to the
+# server's RateLimit-Remaining/RateLimit-Reset headers; Retry-After pauses the host entirely.
+class HostScheduler:
+    def __init__(self, rate=None):
+        self.max_rate = rate or config.host_rate_limit
+        self.rate = self.max_rate
+        self.tokens = float(self.max_rate)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.max_rate, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def observe(self, response):
+        headers = response.headers
+        retry_after = _retry_after_seconds(headers.get("Retry-After"))
+        remaining = _int_header(headers, "RateLimit-Remaining")
+        reset_at = _int_header(headers, "RateLimit-Reset")
+        with self._lock:
+            now = time.monotonic()
+            if retry_after is not None and response.status_code in retry_status_codes:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            if remaining is not None and reset_at is not None:
+                window = max(reset_at - time.time(), 1.0)
+                if remaining <= 0:
+                    self.blocked_until = max(self.blocked_until, now + window)
+                # Spread what's left of the window's budget evenly over the time until it resets.
+                self.rate = min(self.max_rate, max(remaining / window, config.host_min_rate))
+
+
+def get_host_scheduler(host):
+    with _schedulers_lock:
+        if host not in _schedulers:
+            _schedulers[host] = HostScheduler()
+        return _schedulers[host]
+
+
+# Jittered exponential backoff for the given (0-based) retry attempt.
+def backoff_seconds(attempt):
+    delay = min(config.retry_backoff_seconds * (2 ** attempt), config.retry_backoff_max_seconds)
+    return delay * random.uniform(0.5, 1.5)
+
+
+def retry_delay(response, attempt):
+    retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+    if retry_after is not None:
+        return min(retry_after, config.retry_backoff_max_seconds)
+    return backoff_seconds(attempt)
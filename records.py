@@ -0,0 +1,96 @@
+# Slotted records passed between the pipeline stages. Sweeps create one per project x branch
+# (and one per protected-branch rule), so they carry no per-instance __dict__.
+
+
+# The fields of a Jira issue the revoke flow reads, parsed once from the issue JSON.
+class IssueInfo:
+    __slots__ = ("key", "assignee", "email", "status", "fix_versions", "updated")
+
+    def __init__(self, key, assignee=None, email=None, status=None, fix_versions=(), updated=None):
+        self.key = key
+        self.assignee = assignee
+        self.email = email
+        self.status = status
+        self.fix_versions = fix_versions
+        self.updated = updated
+
+    @classmethod
+    def from_json(cls, issue):
+        fields = issue.get("fields") or {}
+        assignee = fields.get("assignee") or {}
+        return cls(
+            issue.get("key"),
+            assignee.get("displayName"),
+            assignee.get("emailAddress"),
+            (fields.get("status") or {}).get("name"),
+            tuple(item.get("name") for item in fields.get("fixVersions") or [] if item.get("name")),
+            fields.get("updated"),
+        )
+
+    def __repr__(self):
+        return f"IssueInfo({self.key!r}, assignee={self.assignee!r}, status={self.status!r})"
+
+
+# One protected release branch of one project; hashable, so work lists are deduplicated with sets.
+class BranchTarget:
+    __slots__ = ("project_id", "branch")
+
+    def __init__(self, project_id, branch):
+        self.project_id = project_id
+        self.branch = branch
+
+    def __eq__(self, other):
+        return isinstance(other, BranchTarget) and (self.project_id, self.branch) == (other.project_id, other.branch)
+
+    def __hash__(self):
+        return hash((self.project_id, self.branch))
+
+    def __repr__(self):
+        return f"BranchTarget({self.project_id!r}, {self.branch!r})"
+
+
+# Flattens a {project_id: [branches]} map into unique BranchTargets, keeping first-seen order.
+def branch_targets(branch_project_id_map):
+    return list(dict.fromkeys(
+        BranchTarget(project_id, branch)
+        for project_id, branches in branch_project_id_map.items()
+        for branch in branches
+    ))
+
+
+# One push/merge/unprotect rule of a protected branch.
+class AccessRule:
+    __slots__ = ("id", "levels_key", "user_id", "group_id", "description")
+
+    def __init__(self, id, levels_key, user_id=None, group_id=None, description=None):
+        self.id = id
+        self.levels_key = levels_key
+        self.user_id = user_id
+        self.group_id = group_id
+        self.description = description
+
+    @classmethod
+    def from_json(cls, levels_key, access_rule):
+        return cls(access_rule.get('id'), levels_key, access_rule.get('user_id'), access_rule.get('group_id'),
+                   access_rule.get('access_level_description'))
+
+    def __repr__(self):
+        return f"AccessRule({self.id!r}, {self.levels_key!r}, user_id={self.user_id!r})"
+
+
+# Result of one branch PATCH. Unpacks like the ("Success"|"error", message) tuples it replaces.
+class RevokeOutcome:
+    __slots__ = ("status", "message", "project_id", "branch", "users")
+
+    def __init__(self, status, message, project_id=None, branch=None, users=()):
+        self.status = status
+        self.message = message
+        self.project_id = project_id
+        self.branch = branch
+        self.users = users
+
+    def __iter__(self):
+        return iter((self.status, self.message))
+
+    def __repr__(self):
+        return f"RevokeOutcome({self.status!r}, {self.message!r})"
@@ -0,0 +1,80 @@
+import csv
+import json
+import threading
+from collections import Counter
+from datetime import datetime
+
+record_fields = ["jira", "outcome", "user", "jira_status", "branches", "revoke_status", "detail"]
+
+
+# Flattens a results_summary entry (whose keys vary with the stage a Jira reached) into one record.
+def result_record(result):
+    branch_map = result.get("Branch_Project Status")
+    branches = ""
+    detail = ""
+    if isinstance(branch_map, dict):
+        branches = ";".join(f"{project_id}:{branch}" for project_id, branch_list in branch_map.items() for branch in branch_list)
+    elif branch_map:
+        detail = str(branch_map)
+    user = result.get("User Status")
+    if result.get("Outcome") == "error" and "Jira status" not in result and branch_map is None:
+        # The Jira failed at the user lookup, so "User Status" holds the error.
+        user, detail = None, user
+    return {
+        "jira": result.get("Jira"),
+        "outcome": result.get("Outcome"),
+        "user": user,
+        "jira_status": result.get("Jira status"),
+        "branches": branches,
+        "revoke_status": result.get("Revoke Status"),
+        "detail": detail,
+    }
+
+
+# Streams one record per finished Jira to a JSONL file (or CSV when the path ends in .csv) and
+# writes the aggregated summary once, on close, to <path>.summary.json.
+class ResultSink:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._started = datetime.now().isoformat(timespec="seconds")
+        self._outcomes = Counter()
+        self._revoke_statuses = Counter()
+        self._jiras_by_outcome = {}
+        self._file = open(path, "w", newline="")
+        self._csv = None
+        if path.endswith(".csv"):
+            self._csv = csv.DictWriter(self._file, fieldnames=record_fields)
+            self._csv.writeheader()
+
+    def write(self, result):
+        record = result_record(result)
+        with self._lock:
+            if self._csv:
+                self._csv.writerow(record)
+            else:
+                self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+            self._outcomes[record["outcome"]] += 1
+            self._revoke_statuses[record["revoke_status"] or "-"] += 1
+            self._jiras_by_outcome.setdefault(record["outcome"], []).append(record["jira"])
+
+    def summary(self):
+        with self._lock:
+            return {
+                "started": self._started,
+                "finished": datetime.now().isoformat(timespec="seconds"),
+                "total": sum(self._outcomes.values()),
+                "outcomes": dict(self._outcomes),
+                "revoke_statuses": dict(self._revoke_statuses),
+                "failed": self._jiras_by_outcome.get("error", []),
+                "skipped": self._jiras_by_outcome.get("skipped", []),
+            }
+
+    def close(self):
+        summary = self.summary()
+        with self._lock:
+            self._file.close()
+        with open(f"{self.path}.summary.json", "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+        return summary
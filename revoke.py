@@ -0,0 +1,58 @@
+import importlib
+import sys
+
+# Single entry point for the revoke tools:
+#   python revoke.py revoke-by-jira -g TOKEN (-j DEV-1,DEV-2 | -f FILTER) [options]
+#   python revoke.py revoke-all -g TOKEN (-q | -a ...) [options]
+#   python revoke.py plan PLAN_FILE [--repos] ARGS...   dry run of revoke-by-jira (or revoke-all with --repos)
+#   python revoke.py bench [options]
+# A subcommand's module is imported only when it runs, and importing any of them has no side
+# effects (logging is configured in main), so schedulers and tests can call this in a loop.
+# The older scripts (BranchAccessRevoke.py, Revoke_allrepos.py, branch_revoke.py, ...) still work.
+
+commands = {
+    "revoke-by-jira": ("BranchAccessRevoke", "Revoke Jira assignees' access on the release branches of their MRs"),
+    "revoke-all": ("Revoke_allrepos", "Revoke every user rule on the active release branches of repo groups"),
+    "plan": (None, "Dry run: write the revoke-by-jira (or --repos: revoke-all) plan to PLAN_FILE"),
+    "bench": ("benchmark", "Benchmark both tools against the offline fake server"),
+}
+
+
+def print_usage(stream=sys.stdout):
+    print("usage: revoke.py {" + ",".join(commands) + "} ...\n", file=stream)
+    for command, (_, description) in commands.items():
+        print(f"  {command:<16}{description}", file=stream)
+    print("\nRun 'revoke.py <command> -h' for the options of a command.", file=stream)
+
+
+def run_command(module_name, argv, prog):
+    module = importlib.import_module(module_name)
+    return module.main(argv, prog=prog)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return 0
+    command, argv = argv[0], argv[1:]
+    if command not in commands:
+        print(f"revoke.py: unknown command '{command}'", file=sys.stderr)
+        print_usage(sys.stderr)
+        return 2
+
+    if command == "plan":
+        if not argv or argv[0].startswith("-"):
+            print("usage: revoke.py plan PLAN_FILE [--repos] ARGS...", file=sys.stderr)
+            return 2
+        plan_file, argv = argv[0], argv[1:]
+        module_name = "Revoke_allrepos" if "--repos" in argv else "BranchAccessRevoke"
+        argv = [arg for arg in argv if arg != "--repos"] + ["--plan", plan_file]
+        return run_command(module_name, argv, "revoke.py plan")
+
+    module_name, _ = commands[command]
+    return run_command(module_name, argv, f"revoke.py {command}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import json
+import math
+from datetime import datetime
+
+import config
+from records import AccessRule
+
+# Protected-branch rule lists and the PATCH field that destroys rules from each of them.
+access_level_fields = {
+    "push_access_levels": ("allowed_to_push", "PUSH"),
+    "merge_access_levels": ("allowed_to_merge", "MERGE"),
+    "unprotect_access_levels": ("allowed_to_unprotect", "UNPROTECT"),
+}
+
+
+# Parses every rule of a protected branch once into AccessRules.
+def access_rules(protected_branch):
+    return [
+        AccessRule.from_json(levels_key, access_rule)
+        for levels_key in access_level_fields
+        for access_rule in protected_branch.get(levels_key, [])
+        if access_rule.get('id') is not None
+    ]
+
+
+# Matches the rules granted to a user by name (how Jira assignees are matched today).
+def rule_matches_username(username):
+    return lambda access_rule: access_rule.description == username
+
+
+# Matches a user's rules by GitLab user_id (set lookup) when resolved, else by display name.
+def rule_matches_user(username, user_ids=None):
+    if user_ids:
+        user_ids = set(user_ids)
+        return lambda access_rule: access_rule.user_id in user_ids
+    return rule_matches_username(username)
+
+
+# Matches the rules of several users at once ({username: user_id or None}): resolved users by
+# user_id, the rest by display name. Used when one PATCH revokes a whole batch on a branch.
+def rule_matches_users(users):
+    user_ids = {user_id for user_id in users.values() if user_id}
+    usernames = {username for username, user_id in users.items() if not user_id}
+    return lambda access_rule: access_rule.user_id in user_ids or access_rule.description in usernames
+
+
+# Matches every user-level rule (group and role rules are left alone).
+def is_user_rule(access_rule):
+    return access_rule.user_id is not None and access_rule.group_id is None
+
+
+# Collects every matching rule ID among a branch's AccessRules: {patch_field: [rule ids]}.
+# All matches are kept, not just the first, and duplicate IDs are merged.
+def plan_branch_revocation(rules, match_rule):
+    rule_ids = {}
+    for access_rule in rules:
+        if match_rule(access_rule):
+            rule_ids.setdefault(access_level_fields[access_rule.levels_key][0], set()).add(access_rule.id)
+    return {
+        patch_field: sorted(rule_ids[patch_field])
+        for patch_field, _ in access_level_fields.values()
+        if patch_field in rule_ids
+    }
+
+
+# Turns a branch plan into the single PATCH payload that destroys all of its rules.
+def build_patch_payload(branch_plan):
+    return {
+        patch_field: [{"id": rule_id, "_destroy": True} for rule_id in rule_ids]
+        for patch_field, rule_ids in branch_plan.items()
+    }
+
+
+def describe_branch_plan(branch_plan):
+    labels = {patch_field: label for patch_field, label in access_level_fields.values()}
+    return ', '.join(labels[patch_field] for patch_field in branch_plan)
+
+
+# A saved plan is a flat list of revocations, one per branch PATCH:
+# {"jira", "user", "group", "project_id", "branch", "rules": {patch_field: [rule ids]}}
+# plus the predicted cost of applying it. Batched revocations also carry "users", every
+# assignee whose rules the PATCH destroys.
+def build_plan_document(revocations, read_calls, concurrency):
+    write_calls = len(revocations)
+    concurrency = max(concurrency or 1, 1)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revocations": revocations,
+        "estimate": {
+            "read_calls": read_calls,
+            "write_calls": write_calls,
+            "estimated_apply_seconds": round(math.ceil(write_calls / concurrency) * config.estimated_call_seconds, 1),
+        },
+    }
+
+
+# Merges revocations of the same branch (several Jiras or assignees on one release branch) into
+# one PATCH each: rule IDs, Jiras and users are unioned, first-seen order kept.
+def merge_revocations(revocations):
+    merged = {}
+    for revocation in revocations:
+        key = (revocation["project_id"], revocation["branch"])
+        users = revocation.get("users") or [revocation["user"]]
+        if key not in merged:
+            merged[key] = {**revocation, "jiras": [], "users": [], "rules": {}}
+        entry = merged[key]
+        for jira_id in revocation["jira"].split(", "):
+            if jira_id not in entry["jiras"]:
+                entry["jiras"].append(jira_id)
+        entry["users"] += [user for user in users if user not in entry["users"]]
+        for patch_field, rule_ids in revocation["rules"].items():
+            entry["rules"][patch_field] = sorted(set(entry["rules"].get(patch_field, [])) | set(rule_ids))
+    for entry in merged.values():
+        entry["jira"], entry["user"] = ', '.join(entry.pop("jiras")), ', '.join(entry["users"])
+        entry["rules"] = {patch_field: entry["rules"][patch_field] for patch_field, _ in access_level_fields.values() if patch_field in entry["rules"]}
+    return list(merged.values())
+
+
+def write_plan(path, plan_document):
+    with open(path, "w") as plan_file:
+        json.dump(plan_document, plan_file, indent=2)
+
+
+def load_plan(path):
+    with open(path) as plan_file:
+        return json.load(plan_file)
@@ -0,0 +1,47 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+
+# Append-only JSONL journal of completed steps, so an interrupted run can be resumed.
+# Each line is {"step": ..., "at": ..., **fields}; a step is done once its line is written.
+class RunJournal:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done = {}
+        if os.path.exists(path):
+            with open(path) as journal_file:
+                for line in journal_file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A run killed mid-write can leave a truncated last line.
+                        continue
+                    self._done[self.step_key(entry["step"], entry)] = entry
+        self._file = open(path, "a")
+
+    @staticmethod
+    def step_key(step, fields):
+        if step == "jira":
+            return step, fields["jira"]
+        return step, fields["user"], str(fields["project_id"]), fields["branch"]
+
+    def completed(self, step, **fields):
+        with self._lock:
+            return self._done.get(self.step_key(step, fields))
+
+    def record(self, step, **fields):
+        entry = {"step": step, "at": datetime.now().isoformat(timespec="seconds"), **fields}
+        with self._lock:
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            self._file.flush()
+            self._done[self.step_key(step, entry)] = entry
+
+    def close(self):
+        with self._lock:
+            self._file.close()
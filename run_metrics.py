@@ -0,0 +1,113 @@
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import unquote, urlparse
+
+_lock = threading.Lock()
+_calls = defaultdict(list)
+_phases = defaultdict(list)
+_started_at = time.monotonic()
+
+_endpoint_patterns = [
+    (re.compile(r"/protected_branches/.+$"), "/protected_branches/{branch}"),
+    (re.compile(r"/issue/[^/]+$"), "/issue/{key}"),
+    (re.compile(r"/(projects|users|groups)/\d+"), r"/\1/{id}"),
+]
+
+
+# Collapses IDs, Jira keys and branch names so calls group by endpoint, e.g.
+# /api/v4/projects/2939/protected_branches/release%2F25.3.2 -> /api/v4/projects/{id}/protected_branches/{branch}
+def endpoint_template(url):
+    path = unquote(urlparse(url).path)
+    for pattern, replacement in _endpoint_patterns:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+# Starts a fresh report, e.g. for the next main() in the same process.
+def reset():
+    global _started_at
+    with _lock:
+        _calls.clear()
+        _phases.clear()
+        _started_at = time.monotonic()
+
+
+def record_call(method, url, status, latency, nbytes):
+    key = (urlparse(url).netloc, f"{method} {endpoint_template(url)}")
+    with _lock:
+        _calls[key].append((latency, status, nbytes))
+
+
+# Times one pipeline phase (user lookup, state check, branch map, revoke, ...).
+# Phases of concurrent Jiras overlap, so phase totals are busy time, not wall time.
+@contextmanager
+def phase(name):
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        with _lock:
+            _phases[name].append(time.monotonic() - started)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def summary():
+    with _lock:
+        calls = {key: list(samples) for key, samples in _calls.items()}
+        phases = {name: list(durations) for name, durations in _phases.items()}
+
+    endpoints = []
+    for (host, endpoint), samples in sorted(calls.items()):
+        latencies = [latency for latency, _, _ in samples]
+        endpoints.append({
+            "host": host,
+            "endpoint": endpoint,
+            "calls": len(samples),
+            "errors": sum(1 for _, status, _ in samples if status >= 400),
+            "bytes": sum(nbytes for _, _, nbytes in samples),
+            "total_seconds": round(sum(latencies), 3),
+            "p50_seconds": round(percentile(latencies, 50), 3),
+            "p95_seconds": round(percentile(latencies, 95), 3),
+        })
+
+    hosts = defaultdict(float)
+    for endpoint in endpoints:
+        hosts[endpoint["host"]] += endpoint["total_seconds"]
+
+    return {
+        "wall_seconds": round(time.monotonic() - _started_at, 3),
+        "hosts": {host: round(seconds, 3) for host, seconds in hosts.items()},
+        "phases": {
+            name: {"count": len(durations), "total_seconds": round(sum(durations), 3)}
+            for name, durations in phases.items()
+        },
+        "endpoints": endpoints,
+    }
+
+
+# emit defaults to logging.info; scripts that report with print can pass print instead.
+def log_summary(report=None, emit=logging.info):
+    report = report or summary()
+    emit(f"Timing report: wall time {report['wall_seconds']}s, time per host: {report['hosts']}")
+    for name, totals in report["phases"].items():
+        emit(f"Phase '{name}': {totals['count']} runs, {totals['total_seconds']}s")
+    for endpoint in report["endpoints"]:
+        emit(
+            f"{endpoint['host']} {endpoint['endpoint']}: {endpoint['calls']} calls, {endpoint['errors']} errors, "
+            f"p50 {endpoint['p50_seconds']}s, p95 {endpoint['p95_seconds']}s, {endpoint['bytes']} bytes"
+        )
+
+
+def export_json(path, report=None):
+    with open(path, "w") as report_file:
+        json.dump(report or summary(), report_file, indent=2)
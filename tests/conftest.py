@@ -0,0 +1,44 @@
+import logging
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_server import FakeData, start_server  # noqa: E402
+
+
+# Offline Jira/GitLab server; the REVOKE_* URLs are read by config at import, so the clients
+# are pointed at it by patching config and dropping any cached clients.
+@pytest.fixture
+def fake_gitlab(monkeypatch):
+    import api_clients
+    import config
+
+    data = FakeData(jiras=12, repos=2, users=3)
+    server = start_server(data)
+    monkeypatch.setattr(config, "gitlab_api_url", f"{server.base_url}/gitlab")
+    monkeypatch.setattr(config, "jira_api_url", f"{server.base_url}/jira")
+    monkeypatch.setattr(config, "host_rate_limit", 1000)
+    monkeypatch.setattr(api_clients, "_gitlab_clients", {})
+    monkeypatch.setattr(api_clients, "_jira_client", None)
+    server.data = data
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+# Working directory for main() runs (its log file lands here); main()'s log handlers are
+# removed afterwards so later tests don't write to them.
+@pytest.fixture
+def run_dir(tmp_path, monkeypatch):
+    import BranchAccessRevoke
+
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    for handler in BranchAccessRevoke._log_handlers:
+        logging.getLogger().removeHandler(handler)
+        handler.close()
+    BranchAccessRevoke._log_handlers.clear()
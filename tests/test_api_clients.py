@@ -0,0 +1,29 @@
+import pytest
+import requests
+
+import config
+from api_clients import get_gitlab_client
+
+branch_path = "/projects/1000/protected_branches/release%2F24.3.5"
+
+
+def test_reads_are_retried_on_5xx(fake_gitlab, monkeypatch):
+    monkeypatch.setattr(config, "max_retries", 2)
+    fake_gitlab.error_rate = 1.0
+    assert get_gitlab_client("token").get(branch_path).status_code == 503
+    assert fake_gitlab.calls["GET /gitlab/projects/{id}/protected_branches/{branch}"] == 3
+
+
+def test_patch_is_not_retried_on_5xx(fake_gitlab, monkeypatch):
+    monkeypatch.setattr(config, "max_retries", 2)
+    fake_gitlab.error_rate = 1.0
+    assert get_gitlab_client("token").patch(branch_path, json={}).status_code == 503
+    assert fake_gitlab.calls["PATCH /gitlab/projects/{id}/protected_branches/{branch}"] == 1
+
+
+def test_requests_time_out(fake_gitlab, monkeypatch):
+    monkeypatch.setattr(config, "max_retries", 0)
+    monkeypatch.setattr(config, "http_read_timeout", 0.1)
+    fake_gitlab.latency = 0.5
+    with pytest.raises(requests.exceptions.Timeout):
+        get_gitlab_client("token").get(branch_path)
@@ -0,0 +1,45 @@
+import BranchAccessRevoke
+from records import BranchTarget
+from run_journal import RunJournal
+
+
+def batched(jira_id, username, user_id, branch_map):
+    return {"Jira": jira_id, "Outcome": "Success", "User Status": username, "User ID": user_id,
+            "Branch_Project Status": branch_map, "Revoke Status": "Batched"}
+
+
+results_summary = [
+    batched("DEV-1", "User 1", 101, {1000: ["25.3.0", "24.3.5"]}),
+    batched("DEV-2", "User 2", 102, {1000: ["25.3.0"]}),
+    batched("DEV-3", "User 1", 101, {1000: ["25.3.0"]}),
+    {"Jira": "DEV-4", "Outcome": "error", "User Status": "no assignee"},
+]
+
+
+def test_users_are_grouped_by_branch():
+    assert BranchAccessRevoke.group_branch_users(results_summary) == {
+        BranchTarget(1000, "25.3.0"): {"User 1": 101, "User 2": 102},
+        BranchTarget(1000, "24.3.5"): {"User 1": 101},
+    }
+
+
+def test_journaled_branches_are_left_out(tmp_path, monkeypatch):
+    run_journal = RunJournal(str(tmp_path / "journal.jsonl"))
+    run_journal.record("branch", user="User 2", project_id=1000, branch="25.3.0")
+    monkeypatch.setattr(BranchAccessRevoke, "run_journal", run_journal)
+    assert BranchAccessRevoke.group_branch_users(results_summary) == {
+        BranchTarget(1000, "25.3.0"): {"User 1": 101},
+        BranchTarget(1000, "24.3.5"): {"User 1": 101},
+    }
+
+
+def test_one_patch_per_branch_for_all_users(fake_gitlab):
+    batch_plan, branch_statuses = BranchAccessRevoke.revoke_batched(results_summary, "token")
+    assert sorted((project_id, branch, usernames) for project_id, branch, _, usernames in batch_plan) == [
+        (1000, "24.3.5", ["User 1"]), (1000, "25.3.0", ["User 1", "User 2"]),
+    ]
+    assert set(branch_statuses.values()) == {"Success"}
+    assert fake_gitlab.calls["PATCH /gitlab/projects/{id}/protected_branches/{branch}"] == 2
+
+    remaining = fake_gitlab.data.protected_branches[(1000, "release/25.3.0")]["push_access_levels"]
+    assert [rule["user_id"] for rule in remaining] == [100]
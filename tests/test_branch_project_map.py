@@ -0,0 +1,21 @@
+import BranchAccessRevoke
+
+
+def merge_request(iid, project_id, branch):
+    return {
+        "iid": iid, "title": f"DEV-1 Fix for release {branch}", "state": "merged",
+        "target_project_id": project_id, "project_id": project_id, "target_branch": f"release/{branch}",
+        "web_url": f"https://gitlab.example.com/group/repo-{project_id}/-/merge_requests/{iid}",
+        "updated_at": "2025-11-24T19:05:49.000Z",
+    }
+
+
+def test_later_mrs_of_kept_projects_are_not_dropped(fake_gitlab):
+    fake_gitlab.data.merge_requests = [merge_request(100 + i, 2000 + i, "24.3.5") for i in range(7)]
+    fake_gitlab.data.merge_requests.append(merge_request(200, 2000, "25.3.2"))
+
+    status, branch_map = BranchAccessRevoke.get_branch_project_map("DEV-1", "token")
+    assert status == "Success"
+    assert branch_map == {
+        2000: ["24.3.5", "25.3.2"], 2001: ["24.3.5"], 2002: ["24.3.5"], 2003: ["24.3.5"], 2004: ["24.3.5"],
+    }
@@ -0,0 +1,23 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+
+def patch(server, path, body):
+    request = urllib.request.Request(f"{server.base_url}/gitlab{path}", data=json.dumps(body).encode(), method="PATCH")
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def test_patch_destroys_rules_and_rejects_unknown_ids(fake_gitlab):
+    branch_path = "/projects/1000/protected_branches/release%2F24.3.5"
+    rule_id = fake_gitlab.data.protected_branches[(1000, "release/24.3.5")]["push_access_levels"][0]["id"]
+
+    branch = patch(fake_gitlab, branch_path, {"allowed_to_push": [{"id": rule_id, "_destroy": True}]})
+    assert rule_id not in [rule["id"] for rule in branch["push_access_levels"]]
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        patch(fake_gitlab, branch_path, {"allowed_to_push": [{"id": rule_id, "_destroy": True}]})
+    assert error.value.code == 404
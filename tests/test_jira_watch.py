@@ -0,0 +1,30 @@
+from jira_watch import WatchState
+from records import IssueInfo
+
+
+def issue(key, updated="2025-11-24T19:05:49.000+0000"):
+    return IssueInfo(key=key, assignee=None, email=None, status="Closed", fix_versions=[], updated=updated)
+
+
+def test_failures_come_first_and_survive_the_cap(tmp_path):
+    watch_state = WatchState(str(tmp_path / "watch.json"))
+    watch_state.failed = ["DEV-8", "DEV-9"]
+    issues = [issue("DEV-1"), issue("DEV-2"), issue("DEV-9")]
+
+    jira_list = watch_state.pending(issues)[:2]
+    assert jira_list == ["DEV-8", "DEV-9"]
+
+    watch_state.advance(issues, [{"Jira": "DEV-8", "Outcome": "error"}, {"Jira": "DEV-9", "Outcome": "Success"}])
+    assert watch_state.failed == ["DEV-8"]
+    assert watch_state.processed == {"DEV-9": "2025-11-24T19:05:49.000+0000"}
+    assert watch_state.pending(issues) == ["DEV-8", "DEV-1", "DEV-2"]
+
+
+def test_unprocessed_failures_are_carried_over(tmp_path):
+    watch_state = WatchState(str(tmp_path / "watch.json"))
+    watch_state.failed = ["DEV-8", "DEV-9"]
+    watch_state.advance([], [{"Jira": "DEV-8", "Outcome": "Success"}])
+    assert watch_state.failed == ["DEV-9"]
+
+    watch_state.save()
+    assert WatchState(watch_state.path).failed == ["DEV-9"]
@@ -0,0 +1,20 @@
+import json
+import logging
+
+import BranchAccessRevoke
+import revoke
+
+
+def test_main_runs_twice_in_one_process(fake_gitlab, run_dir):
+    for run in range(2):
+        results = run_dir / f"results{run}.jsonl"
+        assert revoke.main(["revoke-by-jira", "-g", "token", "-j", "DEV-1,DEV-2", "--results", str(results)]) == 0
+        assert [json.loads(line)["jira"] for line in results.read_text().splitlines()] == ["DEV-1", "DEV-2"]
+
+    # One file and one console handler, however often main() ran.
+    assert len([handler for handler in logging.getLogger().handlers if handler in BranchAccessRevoke._log_handlers]) == 2
+    assert BranchAccessRevoke.result_sink is None and BranchAccessRevoke.run_journal is None
+
+
+def test_main_exit_code_reports_failed_jiras(fake_gitlab, run_dir):
+    assert revoke.main(["revoke-by-jira", "-g", "token", "-j", "DEV-1,DEV-404", "--retry_failed", "0"]) == 1
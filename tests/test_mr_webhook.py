@@ -0,0 +1,63 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import BranchAccessRevoke
+from mr_index import MergeRequestIndex
+from mr_webhook import WebhookServer, index_payload, replay_payloads
+
+payload = {
+    "object_kind": "merge_request",
+    "project": {"id": 1000},
+    "object_attributes": {
+        "iid": 7, "title": "DEV-7 Fix for release 25.3.0", "state": "merged", "target_project_id": 1000,
+        "target_branch": "release/25.3.0", "url": "https://gitlab.example.com/group/repo/-/merge_requests/7",
+        "updated_at": "2025-11-24T19:05:49.000Z",
+    },
+}
+
+
+def post(server, token):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_address[1]}/", data=json.dumps(payload).encode(),
+        headers={"X-Gitlab-Token": token}, method="POST",
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def test_recorded_payload_replays_into_a_fresh_index(tmp_path):
+    record_path = str(tmp_path / "hooks.jsonl")
+    server = WebhookServer(("127.0.0.1", 0), MergeRequestIndex(str(tmp_path / "live.sqlite3")), secret="s3cret", record_path=record_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(server, "wrong")
+        assert error.value.code == 401
+        assert post(server, "s3cret") == {"indexed": ["DEV-7"]}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    replayed_index = MergeRequestIndex(str(tmp_path / "replayed.sqlite3"))
+    assert replay_payloads(replayed_index, record_path) == 1
+    assert [mr["target_branch"] for mr in replayed_index.lookup("DEV-7")] == ["release/25.3.0"]
+
+
+def test_non_release_mrs_are_not_indexed_and_search_is_kept(fake_gitlab, tmp_path, monkeypatch):
+    master_payload = json.loads(json.dumps(payload))
+    master_payload["object_attributes"].update(title="DEV-1 Fix on master", target_branch="master")
+    merge_request_index = MergeRequestIndex(str(tmp_path / "index.sqlite3"))
+    assert index_payload(merge_request_index, master_payload) == []
+
+    # An index written before the filter still holds the master MR; the search must still run.
+    merge_request_index._db.execute(
+        "INSERT INTO merge_requests VALUES ('DEV-1', 1000, 99, 'DEV-1 Fix on master', 'master', 'url', NULL)"
+    )
+    monkeypatch.setattr(BranchAccessRevoke, "merge_request_index", merge_request_index)
+    status, branch_map = BranchAccessRevoke.get_branch_project_map("DEV-1", "token")
+    assert status == "Success" and "25.3.0" in branch_map[1001]
+    assert fake_gitlab.calls["GET /gitlab/merge_requests"] == 1
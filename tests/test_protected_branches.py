@@ -0,0 +1,24 @@
+import BranchAccessRevoke
+import protected_branches
+
+
+def test_prefetched_index_follows_a_patch(fake_gitlab, monkeypatch):
+    monkeypatch.setattr(protected_branches, "_branch_indexes", {})
+
+    _, _, _, branch_plan = BranchAccessRevoke.plan_branch_access("User 1", 1000, "25.3.0", "token", prefetch=True)
+    assert branch_plan
+    outcome = BranchAccessRevoke.apply_branch_plan("User 1", 1000, "25.3.0", branch_plan, "token")
+    assert outcome.status == "Success"
+
+    # The index was updated from the PATCH response, so planning again finds nothing to destroy.
+    assert BranchAccessRevoke.plan_branch_access("User 1", 1000, "25.3.0", "token", prefetch=True)[3] == {}
+    assert BranchAccessRevoke.plan_branch_access("User 2", 1000, "25.3.0", "token", prefetch=True)[3]
+    assert fake_gitlab.calls["GET /gitlab/projects/{id}/protected_branches"] == 1
+
+
+def test_reset_drops_indexed_projects(fake_gitlab, monkeypatch):
+    monkeypatch.setattr(protected_branches, "_branch_indexes", {})
+    protected_branches.get_protected_branch_index(1000, "token")
+    protected_branches.reset_protected_branch_indexes()
+    protected_branches.get_protected_branch_index(1000, "token")
+    assert fake_gitlab.calls["GET /gitlab/projects/{id}/protected_branches"] == 2
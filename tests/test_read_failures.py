@@ -0,0 +1,19 @@
+import pytest
+
+import BranchAccessRevoke
+import config
+from test_revoke_plan import jira_args
+
+branch_read = "GET /gitlab/projects/{id}/protected_branches/{branch}"
+
+
+@pytest.mark.parametrize("mode", [{"plan": None}, {"plan": "plan.json"}, {"plan": None, "batch": True}, {"plan": "plan.json", "batch": True}])
+def test_failed_branch_read_fails_the_jira(fake_gitlab, monkeypatch, mode):
+    monkeypatch.setattr(config, "max_retries", 0)
+    fake_gitlab.failing_endpoints.add(branch_read)
+
+    results_summary, revocations = BranchAccessRevoke.process_jira_list(["DEV-1", "DEV-2"], "token", jira_args(**mode))
+    assert [result["Outcome"] for result in results_summary] == ["error", "error"]
+    assert [result["Revoke Status"] for result in results_summary] == ["error", "error"]
+    assert revocations == []
+    assert fake_gitlab.calls["PATCH /gitlab/projects/{id}/protected_branches/{branch}"] == 0
@@ -0,0 +1,29 @@
+import Revoke_allrepos
+import config
+from revoke_plan import build_plan_document, write_plan
+
+
+def test_apply_plan_reports_outcomes_and_fails_on_errors(fake_gitlab, tmp_path, capsys):
+    rule_id = fake_gitlab.data.protected_branches[(1000, "release/24.3.5")]["push_access_levels"][0]["id"]
+    plan_path = str(tmp_path / "plan.json")
+    write_plan(plan_path, build_plan_document([
+        {"group": "QA", "project_id": 1000, "branch": "24.3.5", "rules": {"allowed_to_push": [rule_id]}, "users": ["User 0"]},
+        {"group": "QA", "project_id": 1000, "branch": "25.3.0", "rules": {"allowed_to_push": [999999]}, "users": ["User 0"]},
+    ], 0, 1))
+
+    assert Revoke_allrepos.main(["-g", "token", "--apply_plan", plan_path]) == 1
+    output = capsys.readouterr().out
+    assert "1 branches revoked, 1 failed." in output
+    assert "Failed: project 1000, branch '25.3.0'" in output
+
+
+def test_unreadable_branches_fail_the_sweep(fake_gitlab, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "max_retries", 0)
+    monkeypatch.setattr(config, "all_repos", [{"QA": [{1000: "repo-1000", 1001: "repo-1001"}]}])
+    fake_gitlab.failing_endpoints.add("GET /gitlab/projects/{id}/protected_branches/{branch}")
+
+    for dry_run in ([], ["--plan", "plan.json"]):
+        assert Revoke_allrepos.main(["-g", "token", "-q", "-b", "24.3.5"] + dry_run) == 1
+    assert "0 branches checked, 0 with user rules, 0 revoked, 2 failed." in capsys.readouterr().out
+    assert fake_gitlab.calls["PATCH /gitlab/projects/{id}/protected_branches/{branch}"] == 0
@@ -0,0 +1,47 @@
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+
+import BranchAccessRevoke
+import protected_branches
+from revoke_plan import merge_revocations
+
+
+def jira_args(**overrides):
+    args = dict(qa_mode=False, concurrency=4, prefetch=False, plan="plan.json", batch=False, workers=4, retry_failed=0)
+    args.update(overrides)
+    return Namespace(**args)
+
+
+def test_merge_revocations_unions_rules_jiras_and_users():
+    revocations = merge_revocations([
+        {"jira": "DEV-1", "user": "User 1", "project_id": 1000, "branch": "25.3.0", "rules": {"allowed_to_push": [3, 1]}},
+        {"jira": "DEV-7", "user": "User 1", "project_id": 1000, "branch": "25.3.0", "rules": {"allowed_to_merge": [9], "allowed_to_push": [1]}},
+        {"jira": "DEV-2", "user": "User 2", "project_id": 1000, "branch": "25.3.0", "rules": {"allowed_to_push": [4]}},
+        {"jira": "DEV-1", "user": "User 1", "project_id": 1001, "branch": "25.3.0", "rules": {"allowed_to_push": [5]}},
+    ])
+    assert revocations == [
+        {"jira": "DEV-1, DEV-7, DEV-2", "user": "User 1, User 2", "users": ["User 1", "User 2"], "project_id": 1000,
+         "branch": "25.3.0", "rules": {"allowed_to_push": [1, 3, 4], "allowed_to_merge": [9]}},
+        {"jira": "DEV-1", "user": "User 1", "users": ["User 1"], "project_id": 1001, "branch": "25.3.0",
+         "rules": {"allowed_to_push": [5]}},
+    ]
+
+
+def test_plan_has_one_revocation_per_branch(fake_gitlab, monkeypatch):
+    monkeypatch.setattr(protected_branches, "_branch_indexes", {})
+    # DEV-1 and DEV-7 share an assignee, project and branch in the fake data.
+    _, revocations = BranchAccessRevoke.process_jira_list(["DEV-1", "DEV-7"], "token", jira_args())
+    assert len(revocations) == 1
+    assert revocations[0]["jira"] == "DEV-1, DEV-7"
+    assert fake_gitlab.calls["PATCH /gitlab/projects/{id}/protected_branches/{branch}"] == 0
+
+
+def test_concurrent_revokes_of_one_branch_patch_once(fake_gitlab):
+    def revoke(_):
+        return BranchAccessRevoke.revoke_access("User 1", {1000: ["25.3.0"]}, "token", user_id=101)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        outcomes = [outcome for results in executor.map(revoke, range(2)) for outcome in results]
+
+    assert [outcome.status for outcome in outcomes] == ["Success"]
+    assert fake_gitlab.calls["PATCH /gitlab/projects/{id}/protected_branches/{branch}"] == 1
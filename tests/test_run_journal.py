@@ -0,0 +1,51 @@
+import BranchAccessRevoke
+import revoke
+from run_journal import RunJournal
+from test_revoke_plan import jira_args
+
+
+def test_completed_steps_survive_a_truncated_line(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    run_journal = RunJournal(path)
+    run_journal.record("jira", jira="DEV-1", result={"Outcome": "Success"})
+    run_journal.record("branch", user="User 1", project_id=1000, branch="25.3.0")
+    run_journal.close()
+    with open(path, "a") as journal_file:
+        journal_file.write('{"step": "jira", "jira": "DEV-2", "resu')
+
+    resumed = RunJournal(path)
+    assert resumed.completed("jira", jira="DEV-1")["result"] == {"Outcome": "Success"}
+    assert resumed.completed("branch", user="User 1", project_id="1000", branch="25.3.0")
+    assert resumed.completed("jira", jira="DEV-2") is None
+    resumed.close()
+
+
+def test_resume_skips_completed_jiras(fake_gitlab, run_dir):
+    assert revoke.main(["revoke-by-jira", "-g", "token", "-j", "DEV-1,DEV-2", "--journal", "journal.jsonl"]) == 0
+    assert fake_gitlab.calls["PATCH /gitlab/projects/{id}/protected_branches/{branch}"] == 2
+
+    fake_gitlab.calls.clear()
+    assert revoke.main(["revoke-by-jira", "-g", "token", "-j", "DEV-1,DEV-2,DEV-3", "--resume", "journal.jsonl"]) == 0
+    # Only DEV-3 is looked up and revoked again.
+    assert fake_gitlab.calls["GET /gitlab/merge_requests"] == 1
+    assert fake_gitlab.calls["PATCH /gitlab/projects/{id}/protected_branches/{branch}"] == 1
+
+
+def test_jira_updated_since_journaled_runs_again(fake_gitlab, tmp_path, monkeypatch):
+    monkeypatch.setattr(BranchAccessRevoke, "issue_snapshots", {})
+    monkeypatch.setattr(BranchAccessRevoke, "run_journal", RunJournal(str(tmp_path / "journal.jsonl")))
+    args = jira_args(plan=None)
+    BranchAccessRevoke.process_jira_list(["DEV-1"], "token", args)
+    assert fake_gitlab.calls["GET /gitlab/merge_requests"] == 1
+
+    # Unchanged: skipped from the journal.
+    BranchAccessRevoke.process_jira_list(["DEV-1"], "token", args)
+    assert fake_gitlab.calls["GET /gitlab/merge_requests"] == 1
+
+    # Reopened and closed again, as a --watch cycle sees it: run again.
+    fake_gitlab.data.issues["DEV-1"]["fields"]["updated"] = "2025-12-01T08:00:00.000+0000"
+    BranchAccessRevoke.issue_snapshots.clear()
+    BranchAccessRevoke.get_issue_snapshot("DEV-1")
+    BranchAccessRevoke.process_jira_list(["DEV-1"], "token", args)
+    assert fake_gitlab.calls["GET /gitlab/merge_requests"] == 2
+    BranchAccessRevoke.run_journal.close()
@@ -0,0 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import user_index
+
+
+def test_substring_match_is_not_accepted():
+    candidates = [{"id": 7, "username": "sleeds", "name": "Sam Leeds"}]
+    assert user_index._pick_user(candidates, "Sam Lee", "slee@example.com") is None
+
+
+def test_exact_matches_are_accepted():
+    candidates = [
+        {"id": 7, "username": "sleeds", "name": "Sam Leeds"},
+        {"id": 8, "username": "slee", "name": "Sam Lee"},
+    ]
+    assert user_index._pick_user(candidates, "Sam Lee", None)["id"] == 8
+    assert user_index._pick_user(candidates, "Someone", "slee@example.com")["id"] == 8
+
+
+def test_each_assignee_is_searched_once_with_workers(fake_gitlab, monkeypatch):
+    monkeypatch.setattr(user_index, "_user_ids", {})
+    assignees = [(f"User {i % 3}", f"user{i % 3}@example.com") for i in range(12)]
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        user_ids = list(executor.map(lambda assignee: user_index.resolve_gitlab_user_id(*assignee, "token"), assignees))
+
+    assert user_ids == [100 + i % 3 for i in range(12)]
+    # One lookup per assignee: the fake finds nobody by email, so an email and a name search each.
+    assert fake_gitlab.calls["GET /gitlab/users"] == 2 * 3
@@ -0,0 +1,77 @@
+import logging
+import threading
+
+import requests
+
+from api_clients import get_gitlab_client
+
+_user_ids = {}
+_user_locks = {}
+_user_locks_guard = threading.Lock()
+
+
+def _user_lock(key):
+    with _user_locks_guard:
+        if key not in _user_locks:
+            _user_locks[key] = threading.Lock()
+        return _user_locks[key]
+
+
+# Forgets resolved assignees, so the next run looks them up again.
+def reset_user_ids():
+    with _user_locks_guard:
+        _user_ids.clear()
+
+
+# /users?search= matches substrings ("Sam Lee" also finds "Sam Leeds"), so a candidate is only
+# accepted on an exact email, username (email local part) or display-name match, and only if
+# exactly one candidate matches. Anything else is None and rules are matched by name instead.
+def _pick_user(candidates, display_name, email):
+    email = (email or '').lower()
+    checks = []
+    if email:
+        checks.append(lambda user: (user.get('public_email') or user.get('email') or '').lower() == email)
+        checks.append(lambda user: (user.get('username') or '').lower() == email.split('@')[0])
+    if display_name:
+        checks.append(lambda user: (user.get('name') or '').lower() == display_name.lower())
+    for matches in checks:
+        matched = [user for user in candidates if matches(user)]
+        if len(matched) == 1:
+            return matched[0]
+    return None
+
+
+# Maps a Jira assignee to a GitLab user_id, trying the Jira email first and then the display name.
+# Each assignee is looked up once per run; None means unresolved (callers fall back to name matching).
+def resolve_gitlab_user_id(display_name, email, private_token):
+    key = (private_token, display_name, email)
+    # Held for the whole lookup, so concurrent Jiras of the same assignee wait for one search.
+    with _user_lock(key):
+        if key not in _user_ids:
+            _user_ids[key] = _lookup_user_id(display_name, email, private_token)
+        return _user_ids[key]
+
+
+def _lookup_user_id(display_name, email, private_token):
+    user_id = None
+    gitlab_client = get_gitlab_client(private_token)
+    for search in (email, display_name):
+        if not search:
+            continue
+        try:
+            response = gitlab_client.get("/users", params={"search": search})
+            if response.status_code != 200:
+                logging.warning(f"GitLab user search for '{search}' failed. Status Code: {response.status_code}")
+                continue
+            user = _pick_user(response.json(), display_name, email)
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"Request error while searching GitLab users for '{search}': {e}")
+            continue
+        if user:
+            user_id = user.get('id')
+            logging.info(f"Resolved '{display_name}' to GitLab user {user.get('username')} (id {user_id}).")
+            break
+
+    if user_id is None:
+        logging.warning(f"Could not resolve '{display_name}' to a GitLab user. Matching rules by name instead.")
+    return user_id